@@ -10,12 +10,9 @@ Developer: Ruben du Pon
 Docstrings: Generated by GitHub Copilot.
 """
 
-import copy
 import random
-import csv
 from tqdm import tqdm
 from typing import List, Optional
-from .random import RandomFold
 from ..classes.protein import Protein
 from .hillclimber import HillclimberFold
 
@@ -68,41 +65,38 @@ class AnnealingFold(HillclimberFold):
         # Give feedback that the algorithm has started.
         print("Starting Simulated Annealing fold.")
 
-        # Start with a random fold.
-        start_state = RandomFold(self._protein, self._dimensions)
-        protein = start_state.run()
-
-        # Start the highscore with the score of the random fold.
-        self._highscore = (protein, protein.get_score())
+        # Start the highscore with the best of a few random folds.
+        self._seed_highscore()
 
         # Run the algorithm for the specified number of iterations.
         for iteration in tqdm(range(self._iterations)):
-            next_fold = copy.deepcopy(self._highscore[0])
-            self._run_experiment(next_fold)
+            score = self._highscore[1]
+            self._run_experiment(self._highscore[0])
             self._temperature *= 1 - self._cooling_rate
             self._temperature = max(0.0000001, self._temperature)
 
-            # Write data to file.
-            if self._outputfile:
-
-                self._scores.append(next_fold.get_score())
+            # Store the data for the file.
+            self._write_score(iteration, score)
 
-                with open(self._outputfile, "a") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(
-                        [iteration, str(next_fold), next_fold.get_score()])
+        # Write the data of all iterations to the file.
+        self._write_rows()
 
         # Return the highest scoring protein.
-        self._highscore[0].reset_grid()
-        return self._highscore[0]
+        return self._get_highscore()
 
-    def _check_highscore(self, protein: Protein) -> bool:
+    def _check_highscore(self, protein: Protein,
+                         already_valid: bool = False,
+                         score: Optional[int] = None) -> bool:
         """
         Checks if the given protein has a higher score than the current
         highscore protein.
 
         Parameters:
         - protein (Protein): The protein to be checked.
+        - already_valid (bool): Whether the grid of the protein is already
+          rebuilt and validated, so the check can be skipped.
+        - score (Optional[int]): The score of the protein if it is already
+          known.
 
         Returns:
         - bool: True if the given protein has a higher score and should be
@@ -111,16 +105,18 @@ class AnnealingFold(HillclimberFold):
         Raises:
         - ValueError: If the specified fold algorithm is invalid.
         """
-        # Reset the grid.
-        protein.reset_grid()
-
-        # Early return if the protein is invalid.
-        if not protein.is_valid():
-            return False
+        # Reset the grid if the protein was not validated already.
+        if not already_valid:
+            protein.reset_grid()
 
         # Get the old and new score.
         old_score = self._highscore[1]
-        new_score = protein.get_score()
+        new_score = protein.get_score() if score is None else score
+
+        # Return early if the protein is not better or is invalid.
+        if new_score >= old_score or \
+                not (already_valid or protein.is_valid()):
+            return False
 
         # Get the temperature and update it.
         temperature = self._temperature
@@ -132,7 +128,7 @@ class AnnealingFold(HillclimberFold):
         # Check if the new protein is better than the old one and if it should
         # be accepted.
         if (new_score < self._highscore[1]) and (chance > random.random()):
-            self._highscore = (protein, new_score)
+            self._set_highscore(protein, new_score)
             return True
 
         return False
@@ -9,9 +9,10 @@ Developer: Ilyass el Allali
 
 from functools import lru_cache
 from codefiles.classes.protein import Protein, Aminoacid
+from codefiles.helpers.walks import last_walks
+import numpy as np
 import random
 from typing import Iterable, List, Set, Tuple, Dict, Optional, Any
-import numpy as np
 
 
 class BfsFold:
@@ -23,6 +24,12 @@ class BfsFold:
     moves_3d = {"R": (1, 0, 0), "L": (-1, 0, 0), "U": (0, 1, 0),
                 "D": (0, -1, 0), "F": (0, 0, 1), "B": (0, 0, -1)}
 
+    # For every number of dimensions and length, the folding that
+    # get_possible_foldings settles on for every offset between its end
+    # points, shared by all instances
+    _last_foldings: Dict[Tuple[int, int],
+                         Dict[Tuple[int, int, int], str]] = {}
+
     def __init__(self, protein: Protein, dimensions: int,
                  when_cutting: int = 7, step: int = 1) -> None:
         """
@@ -200,19 +207,23 @@ class BfsFold:
         keys: List[str],
         depth: int,
         step_size: int,
-        best_options: Set[str] = set(),
+        best_options: Iterable[str] = (),
         posit: Optional[List[Tuple[int, int, int]]] = None,
     ) -> Dict[str, int]:
-        seq, score_dict, pos = "", {}, [(0, 0, 0)]
+        score_dict = {}
 
         if depth > len(protein_sequence):
             depth = len(protein_sequence)
 
-        if best_options != set():
+        if best_options:
             valid_combos = self._add_combinations(best_options)
         else:
             valid_combos = self._valid_combinations(list(keys), length=depth)
 
+        # One protein is refolded for every candidate instead of building a
+        # new one each time
+        prt = Protein(protein_sequence[: depth + 1])
+
         for steps in valid_combos:
             if len(best_options) != 0:
                 for option in best_options:
@@ -220,75 +231,44 @@ class BfsFold:
                         : depth - step_size + 1] and len(steps) > len(
                         option
                     ):
-                        prt = Protein(protein_sequence[: depth + 1])
+                        if not posit:
+                            continue
+
+                        # Skip extensions that run into the folded prefix
+                        # before building a protein for them
+                        positions = self._walk(steps[-1], posit)
+                        if positions is None:
+                            continue
+
+                        prt.reset_positions()
+                        current = prt.get_head()
+                        for position in posit + positions:
+                            if current is None:
+                                break
+                            current.position = position
+                            current = current.link
+
                         current = prt.get_head()
-                        if posit:
-                            for i in posit:
-                                if current is None:
-                                    break
-                                current.position = i
-                                if i != (0, 0, 0):
-                                    pos.append(i)
-                                current = current.link
-
-                            dict_ = self._create_nested_dict(
-                                protein, keys, 2, pos=[posit[-1]]
-                            )
-
-                            for step in steps[-1]:
-                                dict_ = dict_[step]
-                                if isinstance(dict_, dict):
-                                    if current is None:
-                                        break
-                                    current.position = dict_["pos"]
-                                    pos.append(current.position)
-                                    seq += step
-                                else:
-                                    current.position = dict_[-1]
-                                    pos.append(current.position)
-                                    seq += step
-
-                            current = prt.get_head()
-                            while current is not None:
-                                prt.add_to_grid(current.position, current)
-                                current = current.link
-
-                            if prt.is_valid():
-                                score_dict[option + seq] = prt.get_score()
-                                seq, pos = "", [(0, 0, 0)]
-                            else:
-                                current = prt.get_head()
-                                while current is not None:
-                                    prt.remove_from_grid(current.position)
-                                    current = current.link
-                                seq, pos = "", [(0, 0, 0)]
-                                continue
+                        while current is not None:
+                            prt.add_to_grid(current.position, current)
+                            current = current.link
+
+                        if prt.is_valid():
+                            score_dict[option + steps[-1]] = prt.get_score()
                     else:
                         continue
             else:
-                prt = Protein(protein_sequence[: depth + 1])
-                dict_ = self._create_nested_dict(protein, keys, depth + 1)
-
-                amino = prt._head
-                if amino is not None:
-                    aminoacid_ = amino.link
-
-                for step in steps:
-                    dict_ = dict_[step]
-                    if isinstance(dict_, dict):
-                        if aminoacid_ is None:
-                            break
-                        aminoacid_.position = dict_["pos"]
-                        pos.append(aminoacid_.position)
-                        seq += step
-                    else:
-                        aminoacid_.position = dict_[-1]
-                        pos.append(aminoacid_.position)
-                        seq += step
+                # Skip self-colliding foldings before building a protein
+                # for them
+                positions = self._walk(steps, [(0, 0, 0)])
+                if positions is None:
+                    continue
 
-                    if aminoacid_ is None:
-                        break
-                    aminoacid_ = aminoacid_.link
+                prt.reset_positions()
+                for aminoacid_, position in zip(
+                    prt.get_list()[1:], positions
+                ):
+                    aminoacid_.position = position
 
                 current = prt.get_head()
                 while current is not None:
@@ -296,18 +276,40 @@ class BfsFold:
                     current = current.link
 
                 if prt.is_valid():
-                    score_dict[seq] = prt.get_score()
-                    seq, pos = "", [(0, 0, 0)]
-                else:
-                    current = prt.get_head()
-                    while current is not None:
-                        prt.remove_from_grid(current.position)
-                        current = current.link
-                    seq, pos = "", [(0, 0, 0)]
-                    continue
+                    score_dict[steps] = prt.get_score()
 
         return score_dict
 
+    def _walk(
+        self, steps: str, path: List[Tuple[int, int, int]]
+    ) -> Optional[List[Tuple[int, int, int]]]:
+        """
+        Follow folding directions from the end of a path, stopping as soon
+        as a position is visited twice.
+
+        Parameters:
+        - steps (str): The folding directions to follow.
+        - path (List[Tuple[int, int, int]]): The positions visited so far.
+
+        Returns:
+        - List[Tuple[int, int, int]] or None: The positions reached by the
+        steps, None if the steps collide with the path or themselves.
+        """
+        visited = set(path)
+        position = path[-1]
+        positions = []
+
+        for step in steps:
+            position = tuple(
+                x + y for x, y in zip(position, BfsFold.moves_3d[step])
+            )
+            if position in visited:
+                return None
+            visited.add(position)
+            positions.append(position)
+
+        return positions
+
     def _is_mirror_or_rotation(self, move1: str, move2: str) -> bool:
         """
         Check if two folding moves are mirror or rotation of each other.
@@ -374,7 +376,7 @@ class BfsFold:
                 "F": (0, 0, 1),
                 "B": (0, 0, -1),
             }
-        min_keys: Set[str] = set()
+        min_keys: List[str] = []
 
         if self.dimensions == 2:
             when_cutting = 7
@@ -394,10 +396,10 @@ class BfsFold:
             posit = [(0, 0, 0)]
 
             min_key = min(create_d, key=lambda k: create_d[k])
-            min_keys = {
+            min_keys = [
                 k for k, v in create_d.items() if v == create_d[min_key]
-            }
-            unique_moves: Set[str] = set()
+            ]
+            unique_moves: List[str] = []
 
             # Check for linear transformations
             for move_ in min_keys:
@@ -405,14 +407,17 @@ class BfsFold:
                     not self._is_mirror_or_rotation(move_, unique_move)
                     for unique_move in unique_moves
                 ):
-                    unique_moves.add(move_)
+                    unique_moves.append(move_)
 
             if len(unique_moves) >= 2:
-                # Randomly select 1 of the set
-                unique_moves = set(random.sample(unique_moves, 1))
+                # Randomly select 1 of the list, random.sample no longer
+                # accepts sets
+                unique_moves = [random.choice(unique_moves)]
 
-            for key in list(unique_moves)[0]:
-                posit.append(tuple(np.array(posit[-1]) + np.array(move[key])))
+            for key in unique_moves[0]:
+                x, y, z = posit[-1]
+                dx, dy, dz = move[key]
+                posit.append((x + dx, y + dy, z + dz))
 
             min_keys = unique_moves
 
@@ -423,7 +428,7 @@ class BfsFold:
         if amino is not None:
             aminoacid_ = amino.link
 
-        folding = random.choice(list(min_keys))
+        folding = random.choice(min_keys)
 
         for direction in folding:
             nested_dict = nested_dict[direction]
@@ -444,94 +449,115 @@ class BfsFold:
     NOTE: This function is for 'Simulated Annealing'
     """
 
-    def get_possible_foldings(
+    def _get_last_folding(
+        self, types: Tuple[str, ...], length: int,
+        offset: Tuple[int, int, int]
+    ) -> Optional[str]:
+        """
+        Get the last valid combination of folding directions, in
+        lexicographic order of the directions, that ends at an offset from
+        its start.
+
+        The combinations only depend on the dimensions and the length, so
+        they are enumerated once and the last combination for every offset
+        is kept.
+
+        Parameters:
+        - types (Tuple[str, ...]): The possible folding directions.
+        - length (int): The number of folding directions.
+        - offset (Tuple[int, int, int]): The offset of the end from the
+        start.
+
+        Returns:
+        - Optional[str]: The folding directions, None if no combination
+        ends at the offset.
+        """
+        key = (self.dimensions, length)
+        last_foldings = BfsFold._last_foldings.get(key)
+
+        if last_foldings is None:
+            # The directions come in pairs with their reverse, as the
+            # enumeration expects
+            move_deltas = np.array([self.moves_3d[direction]
+                                    for direction in types], dtype=np.int64)
+            walks, found = last_walks(length, move_deltas)
+
+            size = 2 * length + 1
+            last_foldings = {}
+            for cell in np.flatnonzero(found).tolist():
+                x, rest = divmod(cell, size * size)
+                y, z = divmod(rest, size)
+                last_foldings[(x - length, y - length, z - length)] = "".join(
+                    types[move] for move in walks[cell].tolist())
+            BfsFold._last_foldings[key] = last_foldings
+
+        return last_foldings.get(offset)
+
+    def get_possible_positions(
         self,
-        protein: Protein,
+        length: int,
         first_coordinate: Tuple[int, int, int],
         last_coordinate: Tuple[int, int, int],
-    ) -> List[List[Optional[Aminoacid]]]:
+    ) -> List[List[Tuple[int, int, int]]]:
         """
-        Get possible foldings between two coordinates.
+        Get the positions of the possible foldings between two coordinates,
+        without building a protein for them.
 
         Parameters:
-        - protein (Protein): The protein structure.
+        - length (int): The number of amino acids of the foldings.
         - first_coordinate (Tuple[int, int, int]): Starting coordinate.
         - last_coordinate (Tuple[int, int, int]): Ending coordinate.
 
         Returns:
-        - List[List[Aminoacid]]: List of possible foldings
-        between the coordinates.
+        - List[List[Tuple[int, int, int]]]: The positions of the amino acids
+        of every possible folding between the coordinates.
         """
-        valid_foldings, proteins, aminoacids, protein_aminoacids, length = (
-            [],
-            [],
-            [],
-            [],
-            len(protein),
-        )
-        move = {
-            "R": (1, 0, 0),
-            "L": (-1, 0, 0),
-            "U": (0, 1, 0),
-            "D": (0, -1, 0),
-            "F": (0, 0, 1),
-            "B": (0, 0, -1),
-        }
-
         if self.dimensions == 2:
             types = ("R", "L", "U", "D")
         elif self.dimensions == 3:
             types = ("R", "L", "U", "D", "F", "B")
 
-        possible_foldings = self._valid_combinations(
-            keys=types, prev=None, length=length - 1
-        )
-        dict_fold = self._create_nested_dict(
-            protein, types, length, prev=None, pos=[first_coordinate]
-        )
-
-        for folding in possible_foldings:
-            dict_ = dict_fold
-            for step in folding:
-                dict_ = dict_[step]
-
-            if dict_["pos"] == last_coordinate:
-                valid_foldings.append(folding)
-
-        for folding in valid_foldings:
-            prt = Protein(protein._sequence)
-            current = prt._head
-            if current is not None:
-                current.position = first_coordinate
+        # Of all valid foldings between the coordinates only the last one is
+        # placed
+        offset = tuple(last - first for first, last in zip(first_coordinate,
+                                                            last_coordinate))
+        folding = self._get_last_folding(types, length - 1, offset)
+        if folding is None:
+            return []
 
+        x, y, z = first_coordinate
+        positions = [first_coordinate]
         for direction in folding:
-            if current is not None and current.link is not None:
-                current = current.link
-                # Check if the link is not None before
-                # accessing its predecessor
-                if current.predecessor is not None:
-                    current.position = tuple(
-                        np.array(current.predecessor.position)
-                        + np.array(move[direction])
-                    )
-
-            proteins.append(prt)
-
-        for prt in proteins:
-            current = prt._head
-            aminoacids.append(current)
-
-            while current is not None and current.link is not None:
-                current = current.link
-                aminoacids.append(current)
+            dx, dy, dz = self.moves_3d[direction]
+            x, y, z = x + dx, y + dy, z + dz
+            positions.append((x, y, z))
 
-            protein_aminoacids.append(aminoacids)
-            aminoacids = []
+        return [positions]
 
-        return protein_aminoacids
+    def get_possible_foldings(
+        self,
+        protein: Protein,
+        first_coordinate: Tuple[int, int, int],
+        last_coordinate: Tuple[int, int, int],
+    ) -> List[List[Optional[Aminoacid]]]:
+        """
+        Get possible foldings between two coordinates.
 
-    def run(self) -> Protein:
+        Parameters:
+        - protein (Protein): The protein structure.
+        - first_coordinate (Tuple[int, int, int]): Starting coordinate.
+        - last_coordinate (Tuple[int, int, int]): Ending coordinate.
 
-        result = self._bfsfold(self._protein, self._cut, self._step)
+        Returns:
+        - List[List[Aminoacid]]: List of possible foldings
+        between the coordinates.
+        """
+        foldings = []
+        for positions in self.get_possible_positions(
+                len(protein), first_coordinate, last_coordinate):
+            prt = Protein(protein._sequence)
+            for acid, position in zip(prt.get_list(), positions):
+                acid.position = position
+            foldings.append(prt.get_list())
 
-        return result
+        return foldings
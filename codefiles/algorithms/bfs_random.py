@@ -11,14 +11,32 @@ Developer: Ilyass el Allali
 
 from ..classes.protein import Protein
 from .bfs import BfsFold
+from ..helpers.bonds import bond_score_matrix
+from ..helpers.kernels import random_rollouts
 import random
 from typing import List
 import numpy as np
 
 
 class Bfs_randomFold(BfsFold):
+    directions = "".join(BfsFold.moves_3d)
+    move_deltas = np.array(list(BfsFold.moves_3d.values()), dtype=np.int64)
+
+    # The directions allowed after each direction, without the reverse.
+    # Directions are indices into directions, the reverse of a direction is
+    # its index XOR 1.
+    allowed_2d, allowed_3d = (
+        np.array(
+            [[move for move in range(count) if move != last ^ 1]
+             for last in range(count)], dtype=np.int64
+            )
+        for count in (4, 6)
+        )
+    rollout_batch = 100
+
     def __init__(
-            self, protein: Protein, dimensions: int, when_cutting=7, step=1
+            self, protein: Protein, dimensions: int, when_cutting=7, step=1,
+            rollouts: int = 1000
             ):
         """
         Initialize MctsFold instance.
@@ -29,10 +47,28 @@ class Bfs_randomFold(BfsFold):
         - when_cutting (int): The length at which to start cutting
         the protein sequence during folding.
         - step (int): The step size to use during folding.
+        - rollouts (int): The maximum number of random completions used
+        to score each direction. They are drawn in batches and the scoring
+        stops early once one direction clearly beats the others.
         """
         super().__init__(protein, dimensions, when_cutting, step)
         self._protein = protein
         self._min_keys = []
+        self._rollouts = rollouts
+
+        # Everything that depends on the dimensions is fixed for the run
+        if dimensions == 2:
+            self._types = tuple(self.directions[:4])
+            self._allowed_moves = self.allowed_2d
+            self._bfs_depth = 6
+        else:
+            self._types = tuple(self.directions)
+            self._allowed_moves = self.allowed_3d
+            self._bfs_depth = 4
+
+        # Score of every pair of amino acids that are not connected,
+        # counted once per pair: -1 for H with H or C and -5 for C with C
+        self._bond_scores = bond_score_matrix(self._sequence)
 
     def _bfsfold(self, protein: Protein, when_cutting, step) -> List[str]:
         """
@@ -51,29 +87,10 @@ class Bfs_randomFold(BfsFold):
         posit = [(0, 0, 0)]
 
         sequence_protein = protein._sequence
-        if self.dimensions == 2:
-            types = {"R", "L", "U", "D"}
-            move = {
-                "R": (1, 0, 0), "L": (-1, 0, 0),
-                "U": (0, 1, 0), "D": (0, -1, 0)
-                }
-        elif self.dimensions == 3:
-            types = {"R", "L", "U", "D", "F", "B"}
-            move = {
-                "R": (1, 0, 0),
-                "L": (-1, 0, 0),
-                "U": (0, 1, 0),
-                "D": (0, -1, 0),
-                "F": (0, 0, 1),
-                "B": (0, 0, -1),
-            }
+        types = self._types
         min_keys = set()
 
-        if self.dimensions == 2:
-            when_cutting = 6
-        elif self.dimensions == 3:
-            when_cutting = 4
-
+        when_cutting = self._bfs_depth
         while len(self._sequence) <= when_cutting:
             when_cutting -= 1
 
@@ -89,7 +106,6 @@ class Bfs_randomFold(BfsFold):
             create_d = self._create_dict(
                 protein, sequence_protein, types, depth, step, min_keys, posit
             )
-            posit = [(0, 0, 0)]
 
             min_key = min(create_d, key=lambda k: create_d[k])
             min_keys = {
@@ -107,59 +123,89 @@ class Bfs_randomFold(BfsFold):
                 ):
                     unique_moves.add(move_)
 
-            if len(unique_moves) >= 2:
-                # Randomly select 1 of the set
-                unique_moves = random.sample(unique_moves, 1)
-            else:
-                unique_moves = list(unique_moves)
-
-            for key in unique_moves[0]:
-                posit.append(tuple(np.array(posit[-1]) + np.array(move[key])))
+            # Randomly select 1 of the set, random.sample no longer
+            # accepts sets
+            unique_moves = tuple(unique_moves)
+            unique_moves = [
+                unique_moves[random.randrange(len(unique_moves))]
+                ]
 
+            posit = self.__get_coordinates(unique_moves)
             min_keys = unique_moves
 
         return min_keys
 
-    def __get_protein_score(self, min_keys):
+    def __get_rollout_scores(
+            self, prefix: np.ndarray, last: int, rollouts: int
+            ) -> np.ndarray:
         """
-        Get the score of the protein folded using the given folding directions.
+        Get the scores of random completions of a partial folding.
 
         Parameters:
-        - min_keys (List[str]): List of folding directions.
+        - prefix (np.ndarray): The positions of the partial folding.
+        - last (int): The index of the last direction of the partial
+        folding.
+        - rollouts (int): The number of random completions.
 
         Returns:
-        - int: The score of the folded protein.
+        - np.ndarray: The scores of the random completions.
         """
-        min_keys_ = min_keys[0]
-
-        if self.dimensions == 2:
-            move = {
-                "R": (1, 0, 0), "L": (-1, 0, 0),
-                "U": (0, 1, 0), "D": (0, -1, 0)}
-        elif self.dimensions == 3:
-            move = {
-                "R": (1, 0, 0),
-                "L": (-1, 0, 0),
-                "U": (0, 1, 0),
-                "D": (0, -1, 0),
-                "F": (0, 0, 1),
-                "B": (0, 0, -1),
-            }
+        return random_rollouts(
+            prefix, last, rollouts,
+            self._allowed_moves, self.move_deltas, self._bond_scores
+            )
 
-        prt = Protein(self._sequence)
-        current = prt.get_head()
-        current.position = (0, 0, 0)
+    def __score_directions(self, prefix: np.ndarray, types) -> dict:
+        """
+        Get the average rollout score of every direction to extend a
+        partial folding with.
 
-        prt.add_to_grid(current.position, current)
+        The rollouts are drawn in batches. After each batch the scoring
+        stops if the best direction beats all others by more than the
+        standard deviation of its own scores.
 
-        for key in min_keys_:
-            current = current.link
-            current.position = tuple(
-                np.array(current.predecessor.position) + np.array(move[key])
-            )
-            prt.add_to_grid(current.position, current)
+        Parameters:
+        - prefix (np.ndarray): The positions of the folding so far.
+        - types (Tuple[int, ...]): The indices of the directions to score.
+
+        Returns:
+        - Dict[int, float]: The average score of every direction.
+        """
+        scores = {action_type: np.empty(0) for action_type in types}
+
+        # The positions of the folding extended with each direction, shared
+        # by all batches of rollouts
+        candidates = {
+            action_type: np.vstack(
+                (prefix, prefix[-1] + self.move_deltas[action_type])
+                )
+            for action_type in types
+        }
+
+        for start in range(0, self._rollouts, self.rollout_batch):
+            batch = min(self.rollout_batch, self._rollouts - start)
+            for action_type in types:
+                scores[action_type] = np.concatenate((
+                    scores[action_type],
+                    self.__get_rollout_scores(
+                        candidates[action_type], action_type, batch
+                        )
+                ))
+
+            dict_scores = {
+                action_type: rollouts.mean()
+                for action_type, rollouts in scores.items()
+            }
+            best = min(dict_scores, key=dict_scores.get)
+            margin = scores[best].std()
+            if all(
+                score - dict_scores[best] > margin
+                for action_type, score in dict_scores.items()
+                if action_type != best
+            ):
+                break
 
-        return prt.get_score()
+        return dict_scores
 
     def __create_final_protein(self, min_keys):
         """
@@ -171,33 +217,8 @@ class Bfs_randomFold(BfsFold):
         Returns:
         - Protein: The final folded protein.
         """
-        min_keys_ = min_keys[0]
-
-        if self.dimensions == 2:
-            move = {
-                "R": (1, 0, 0), "L": (-1, 0, 0),
-                "U": (0, 1, 0), "D": (0, -1, 0)}
-        elif self.dimensions == 3:
-            move = {
-                "R": (1, 0, 0),
-                "L": (-1, 0, 0),
-                "U": (0, 1, 0),
-                "D": (0, -1, 0),
-                "F": (0, 0, 1),
-                "B": (0, 0, -1),
-            }
-
         prt = Protein(self._sequence)
-        current = prt.get_head()
-
-        prt.add_to_grid(current.position, current)
-
-        for key in min_keys_:
-            current = current.link
-            current.position = tuple(
-                np.array(current.predecessor.position) + np.array(move[key])
-            )
-            prt.add_to_grid(current.position, current)
+        prt.set_positions(self.__get_coordinates(min_keys))
 
         return prt
 
@@ -213,24 +234,15 @@ class Bfs_randomFold(BfsFold):
         - List[Tuple[int, int, int]]: List of coordinates
         of the folded protein structure.
         """
-        pos = [(0, 0, 0)]
-        if self.dimensions == 2:
-            move = {
-                "R": (1, 0, 0), "L": (-1, 0, 0),
-                "U": (0, 1, 0), "D": (0, -1, 0)
-                }
-        elif self.dimensions == 3:
-            move = {
-                "R": (1, 0, 0),
-                "L": (-1, 0, 0),
-                "U": (0, 1, 0),
-                "D": (0, -1, 0),
-                "F": (0, 0, 1),
-                "B": (0, 0, -1),
-            }
+        x, y, z = 0, 0, 0
+        pos = [(x, y, z)]
 
+        # Plain integer additions, NumPy is slower than tuples for
+        # three element positions
         for key in min_keys[0]:
-            pos.append(tuple(np.array(pos[-1]) + np.array(move[key])))
+            dx, dy, dz = self.moves_3d[key]
+            x, y, z = x + dx, y + dy, z + dz
+            pos.append((x, y, z))
 
         return pos
 
@@ -246,93 +258,43 @@ class Bfs_randomFold(BfsFold):
         - Protein or bool: The folded protein structure
         if successful, False otherwise.
         """
-        length_protein, min_keys_, dict_scores = len(
-            self._protein
-            ), min_keys, {}
-
-        if self.dimensions == 2:
-            types = {"R", "L", "U", "D"}
-            types_ = {"R", "L", "U", "D"}
-        elif self.dimensions == 3:
-            types = {"R", "L", "U", "D", "F", "B"}
-            types_ = {"R", "L", "U", "D", "F", "B"}
-
-        while length_protein != (len(list(min_keys)[0]) + 1):
-            if min_keys_[0][-1] == "R":
-                types.remove("L")
-            elif min_keys_[0][-1] == "L":
-                types.remove("R")
-            elif min_keys_[0][-1] == "U":
-                types.remove("D")
-            elif min_keys_[0][-1] == "D":
-                types.remove("U")
-            elif min_keys_[0][-1] == "F":
-                types.remove("B")
-            elif min_keys_[0][-1] == "B":
-                types.remove("F")
-
-            for action_type in types.copy():  # iterate over a copy of types
-                for iteration in range(2):
-                    while length_protein != (len(min_keys_[0]) + 1):
-                        if self.dimensions == 2:
-                            types_ = {"R", "L", "U", "D"}
-                        elif self.dimensions == 3:
-                            types_ = {"R", "L", "U", "D", "F", "B"}
-
-                        if min_keys_[0][-1] == "R":
-                            types_.remove("L")
-                        elif min_keys_[0][-1] == "L":
-                            types_.remove("R")
-                        elif min_keys_[0][-1] == "U":
-                            types_.remove("D")
-                        elif min_keys_[0][-1] == "D":
-                            types_.remove("U")
-                        elif min_keys_[0][-1] == "F":
-                            types_.remove("B")
-                        elif min_keys_[0][-1] == "B":
-                            types_.remove("F")
-
-                        min_keys_ = [min_keys_[0] + random.choice(
-                            list(types_))]
-
-                        if iteration == 0:
-                            dict_scores[
-                                action_type
-                                ] = self.__get_protein_score(
-                                min_keys_
-                            )
-                        else:
-                            dict_scores[action_type] = dict_scores[
-                                action_type
-                            ] + self.__get_protein_score(min_keys_)
-
-                    min_keys_ = min_keys
-
-                dict_scores[action_type] = dict_scores[action_type] / 2
-
-            min_keys__ = [min_keys[0] + min(dict_scores, key=dict_scores.get)]
-            coordinates_ = self.__get_coordinates(min_keys__)
-
-            while len(coordinates_) != len(set(coordinates_)):
-                del dict_scores[min(dict_scores, key=dict_scores.get)]
+        remaining = len(self._protein) - 1 - len(min_keys[0])
+
+        # The positions of the folding so far, extended one step at a time,
+        # both as a list with a visited set and as an array for the rollouts
+        path = self.__get_coordinates(min_keys)
+        visited = set(path)
+        coordinates = np.zeros((len(self._protein), 3), dtype=np.int64)
+        coordinates[:len(path)] = path
+        last = self.directions.index(min_keys[0][-1])
+
+        while remaining:
+            types = self._allowed_moves[last]
+            dict_scores = self.__score_directions(
+                coordinates[:len(path)], types
+                )
+
+            # Take the best scoring direction that does not collide, only
+            # the new position can collide with the path
+            for action_type, _ in sorted(
+                dict_scores.items(), key=lambda item: item[1]
+            ):
+                direction = self.directions[action_type]
+                position = tuple(
+                    x + y for x, y in zip(path[-1], self.moves_3d[direction])
+                )
+                if position not in visited:
+                    break
+            else:
                 # If he is stuck
-                if len(dict_scores) == 0:
-                    return False
-                min_keys__ = [
-                    min_keys[0] + min(dict_scores, key=dict_scores.get)
-                    ]
-                coordinates_ = self.__get_coordinates(min_keys__)
-
-            min_keys = min_keys__
-            min_keys_ = min_keys
-            dict_scores = {}
-
-            if self.dimensions == 2:
-                types = {"R", "L", "U", "D"}
-                types_ = {"R", "L", "U", "D"}
-            elif self.dimensions == 3:
-                types = {"R", "L", "U", "D", "F", "B"}
-                types_ = {"R", "L", "U", "D", "F", "B"}
+                return False
+
+            min_keys = [min_keys[0] + direction]
+            last = action_type
+            coordinates[len(path)] = position
+            path.append(position)
+            visited.add(position)
+            remaining -= 1
 
         return self.__create_final_protein(min_keys)
 
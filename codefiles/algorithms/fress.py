@@ -118,24 +118,12 @@ class FressFold(RandomFold):
                 and len(pos) == 3
             ]
 
-            # Defining all adjacent positions
-            adjacent_positions = [
-                (1, 0, 0),
-                (-1, 0, 0),
-                (0, 1, 0),
-                (0, -1, 0),
-                (0, 0, 1),
-                (0, 0, -1),
-            ]
-
             # Filtering out adjacent positions that are not already connected
+            x, y, z = current.position
             check_positions = [
-                (c + adj[0], d + adj[1], e + adj[2])
-                for (c, d, e), adj in zip(
-                    [current.position] * len(adjacent_positions),
-                    adjacent_positions
-                )
-                if (c + adj[0], d + adj[1], e + adj[2]) not in connections
+                (x + dx, y + dy, z + dz)
+                for dx, dy, dz in Protein.adjacent_positions
+                if (x + dx, y + dy, z + dz) not in connections
             ]
 
             # Evaluating each position for stability contribution
@@ -476,7 +464,7 @@ class FressFold(RandomFold):
             index += 1
 
         path = []
-        directions = super()._get_directions()
+        directions = list(super()._get_directions())
 
         # Determine the number of merges required,
         # based on the start and end indices
@@ -513,14 +501,15 @@ class FressFold(RandomFold):
                             path.append(new_position)
                             break
                         else:
-                            print(random_direction)
-                            print(directions)
+                            if self._verbose:
+                                print(random_direction)
+                                print(directions)
                             # Remove direction if not valid
                             if random_direction in directions:
                                 directions.remove(random_direction)
 
                 if not directions:
-                    print("Backtracking")
+                    print("Backtracking") if self._verbose else None
                     # Backtracking is needed
                     if len(path) > 4:
                         avoid_direction_path = (
@@ -538,7 +527,7 @@ class FressFold(RandomFold):
                         )
                     else:
                         avoid_direction_failed_path = None
-                    directions = super()._get_directions()
+                    directions = list(super()._get_directions())
 
                     if (avoid_direction_path and
                             avoid_direction_path in directions):
@@ -558,7 +547,7 @@ class FressFold(RandomFold):
                 if len(random_direction) == 3:
                     x, y, z = random_direction
                     avoid_direction = (-x, -y, -z)
-                    directions = super()._get_directions()
+                    directions = list(super()._get_directions())
 
                     if avoid_direction in directions:
                         directions.remove(avoid_direction)
@@ -68,8 +68,9 @@ class HelixFold:
 
         current = current.link
 
-# Loop until a valid folding is found.
-        while not self._protein.is_valid():
+# Place the amino acids one by one, the validity is only checked once
+        # all of them have a position.
+        while current is not None:
 
             # Get the next movement.
             movement = HelixFold.movements[movement_index]
@@ -82,15 +83,11 @@ class HelixFold:
                 counter = 0
 
 # Set the position of the next amino acid and add it to the grid.
-            current.position = tuple(
-                sum(x) for x in zip(current.predecessor.position, movement)
-            )
+            x, y, z = current.predecessor.position
+            dx, dy, dz = movement
+            current.position = (x + dx, y + dy, z + dz)
             self._protein.add_to_grid(current.position, current)
 
-# If the next amino acid is the last one, break the loop.
-            if current.link is None:
-                break
-
             current = current.link
             movement_index = (movement_index + 1) % len(HelixFold.movements)
             counter += 1
@@ -12,8 +12,8 @@ Docstrings: Generated by GitHub Copilot.
 """
 
 import copy
-import csv
 import random
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Optional, Tuple
 from .random import RandomFold
 from .bfs import BfsFold
@@ -32,6 +32,9 @@ class HillclimberFold:
     - scores (List[int]): The list of scores obtained during the algorithm.
     - outputfile (Optional[str]): The path to the output file to write the scores.
     - verbose (Optional[bool]): Whether to print verbose output during the algorithm.
+    - workers (int): The number of processes to run experiments in.
+    - patience (Optional[int]): The number of iterations without a new
+      highscore after which the algorithm stops early.
 
     Methods:
     - run(): Runs the hillclimber folding algorithm and returns the highest
@@ -42,7 +45,9 @@ class HillclimberFold:
     def __init__(self, protein: Protein, dimensions: int, iterations: int,
                  scores: List[int] = [],
                  outputfile: Optional[str] = None,
-                 verbose: Optional[bool] = False) -> None:
+                 verbose: Optional[bool] = False,
+                 workers: int = 1,
+                 patience: Optional[int] = None) -> None:
         """
         Initializes a new instance of the HillclimberFold class.
 
@@ -53,6 +58,13 @@ class HillclimberFold:
         - scores (List[int]): The list of scores obtained during the algorithm.
         - outputfile (Optional[str]): The path to the output file to write the scores.
         - verbose (Optional[bool]): Whether to print verbose output during the algorithm.
+        - workers (int): The number of processes to run experiments in.
+          With more than one worker, each round runs one experiment per
+          worker from the current highscore and keeps the best result.
+        - patience (Optional[int]): The number of iterations without a new
+          highscore after which the algorithm stops early, None to always
+          run all iterations. With more than one worker the check is made
+          after every round.
 
         Raises:
         - ValueError: If the dimensions parameter is not 2 or 3.
@@ -66,7 +78,18 @@ class HillclimberFold:
         self._highscore = (protein, 0)
         self._scores = scores
         self._outputfile = outputfile
+        self._rows: List[List] = []
         self._verbose = verbose
+        self._workers = workers
+        self._patience = patience
+
+        # The protein the experiments fold, reused between iterations and
+        # swapped with the highscore when it becomes the new highscore.
+        self._scratch: Optional[Protein] = None
+
+        # The search does not depend on the protein it is created with, so
+        # one instance serves every experiment.
+        self._search = BfsFold(protein, dimensions)
 
     def run(self) -> Protein:
         """
@@ -83,35 +106,149 @@ class HillclimberFold:
         # Give feedback that the algorithm has started.
         print("Starting hillclimber fold.")
 
-        # Start with a random fold.
-        start_state = RandomFold(self._protein, self._dimensions)
-        protein = start_state.run()
+        # Start the highscore with the best of a few random folds.
+        self._seed_highscore()
 
-        # Start the highscore with the score of the random fold.
-        self._highscore = (protein, protein.get_score())
+        # Spread the experiments over multiple processes if requested.
+        if self._workers > 1:
+            self._run_parallel()
+            self._write_rows()
+            return self._get_highscore()
 
-        # Run the algorithm for the specified number of iterations.
+        # Run the algorithm for the specified number of iterations, every
+        # row holds the score the experiment started from.
+        stagnant = 0
         for iteration in tqdm(range(self._iterations)):
-            next_fold = copy.deepcopy(self._highscore[0])
-            self._run_experiment(next_fold)
+            score = self._highscore[1]
+            self._run_experiment(self._highscore[0])
+            self._write_score(iteration, score)
 
-            # Write data to file.
-            if self._outputfile:
-                self._scores.append(next_fold.get_score())
-                with open(self._outputfile, "a") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(
-                        [iteration, str(next_fold), next_fold.get_score()])
+            # Stop early once the highscore has stopped improving.
+            stagnant = 0 if self._highscore[1] < score else stagnant + 1
+            if self._patience is not None and stagnant >= self._patience:
+                break
+        self._write_rows()
 
         # Return the highest scoring protein.
-        return self._highscore[0]
+        return self._get_highscore()
+
+    def _get_highscore(self) -> Protein:
+        """
+        Returns the highscore protein, after checking that the score kept
+        for it during the run is its actual score.
+
+        Returns:
+        - Protein: The highest scoring protein fold.
+        """
+        protein, score = self._highscore
+        assert score == protein.get_score(), \
+            f"Highscore {score} does not match the fold score " \
+            f"{protein.get_score()}."
+        return protein
+
+    def _seed_highscore(self, attempts: int = 5) -> None:
+        """
+        Seeds the highscore with the best of a few valid random folds, so a
+        stricter bound rejects more candidates from the start.
+
+        Parameters:
+        - attempts (int): The number of valid random folds to choose from.
+
+        Returns:
+        - None
+        """
+        folds: List[Protein] = []
+        while len(folds) < attempts:
+            fold = RandomFold(Protein(str(self._protein)),
+                              self._dimensions).run()
+
+            # Backtracking can leave amino acids in the grid of a random
+            # fold or leave it overlapping. The experiments expect the
+            # highscore to be valid with an exact grid, and overlapping
+            # folds tend to score lower, so they are retried.
+            fold.reset_grid()
+            if fold.is_valid():
+                folds.append(fold)
+        self._highscore = min(((fold, fold.get_score()) for fold in folds),
+                              key=lambda highscore: highscore[1])
+
+    def _run_parallel(self) -> None:
+        """
+        Runs the experiments in rounds of one experiment per worker, each
+        starting from the current highscore, and keeps the best result of
+        every round.
+
+        Returns:
+        - None
+        """
+        iteration = 0
+        stagnant = 0
+        with ProcessPoolExecutor(max_workers=self._workers) as executor, \
+                tqdm(total=self._iterations) as progress:
+            while iteration < self._iterations:
+                batch = min(self._workers, self._iterations - iteration)
+                score = self._highscore[1]
+                jobs = [(self._highscore, self._dimensions,
+                         random.randrange(2 ** 32)) for _ in range(batch)]
+
+                for highscore in executor.map(_experiment_worker, jobs):
+                    if highscore[1] < self._highscore[1]:
+                        self._highscore = highscore
+                        stagnant = 0
+                        print(
+                            f"New highscore found: {self._highscore[1]}.") if \
+                            self._verbose else None
+                    else:
+                        stagnant += 1
+                    self._write_score(iteration, score)
+                    iteration += 1
+
+                progress.update(batch)
+
+                # Stop early once the highscore has stopped improving.
+                if self._patience is not None and \
+                        stagnant >= self._patience:
+                    break
+
+    def _write_score(self, iteration: int, score: int) -> None:
+        """
+        Stores the score of an iteration and its row for the output file,
+        which _write_rows() writes at the end of the run.
+
+        Parameters:
+        - iteration (int): The number of the iteration.
+        - score (int): The score of the protein fold of the iteration.
+
+        Returns:
+        - None
+        """
+        if self._outputfile:
+            self._scores.append(score)
+            self._rows.append([iteration, str(self._protein), score])
+
+    def _write_rows(self) -> None:
+        """
+        Appends the stored rows of all iterations to the output file at once.
+
+        Returns:
+        - None
+        """
+        if self._outputfile:
+            with open(self._outputfile, "a", buffering=1 << 20,
+                      newline="") as file:
+                # The rows need no quoting, so they are formatted as one
+                # string with the line ending of csv.writer
+                file.write("".join(f"{iteration},{protein},{score}\r\n"
+                                   for iteration, protein, score
+                                   in self._rows))
+            self._rows.clear()
 
     def _run_experiment(self, protein: Protein) -> None:
         """
-        Runs an experiment for a given protein.
+        Runs an experiment for a given protein, which is left unchanged.
 
         Parameters:
-        - protein (Protein): The protein to run the experiment on.
+        - protein (Protein): The highscore protein to run the experiment on.
 
         Returns:
         - None
@@ -119,22 +256,20 @@ class HillclimberFold:
         # Get a random snippet of the protein.
         start_position, end_position = self._get_snippet(protein)
 
-        # Get the snippet.
-        snippet_acids = protein.get_list()[start_position:end_position]
-        sequence = "".join([str(acid) for acid in snippet_acids])
-        snippet = Protein(sequence)
-
-        # Get the coordinates of the snippet.
-        start_coordinates = snippet_acids[0].position
-        end_coordinates = snippet_acids[-1].position
+        # Get the coordinates of the snippet, only its positions are needed
+        # so no protein is built for it.
+        acids = protein.get_list()
+        start_coordinates = acids[start_position].position
+        end_coordinates = acids[end_position - 1].position
 
         # Process the snippet.
-        args = (snippet, protein, start_coordinates,
+        args = (end_position - start_position, protein, start_coordinates,
                 end_coordinates, start_position)
-        best_protein = self._process_snippet(args)
+        best_protein, score = self._process_snippet(args)
 
-        # Update the highscore if necessary.
-        self._check_highscore(best_protein)
+        # Update the highscore if necessary, the snippet processing already
+        # validated and scored the protein.
+        self._check_highscore(best_protein, already_valid=True, score=score)
 
     def _get_snippet(self, protein: Protein) -> Tuple[int, int]:
         """
@@ -157,67 +292,138 @@ class HillclimberFold:
 
         return start_position, end_position
 
-    def _process_snippet(self, args: Tuple[Protein, Protein,
+    def _process_snippet(self, args: Tuple[int, Protein,
                                            Tuple[int, int, int],
                                            Tuple[int, int, int], int]) -> \
-            Protein:
+            Tuple[Protein, int]:
         """
          Processes a snippet of the protein.
 
+        The protein has to be a copy of the highscore, its score is taken
+        from the highscore.
+
         Parameters:
-        - args (Tuple[Protein, Protein, Tuple[int, int, int],
+        - args (Tuple[int, Protein, Tuple[int, int, int],
                 Tuple[int, int, int], int]):
-          The arguments required for processing the snippet.
+          The length of the snippet and the other arguments required for
+          processing it.
 
         Returns:
-        - Protein: The best protein fold obtained from processing the snippet.
+        - Tuple[Protein, int]: The best protein fold obtained from processing
+          the snippet and its score.
         """
-        snippet, protein, start_coordinates, end_coordinates, \
+        length, protein, start_coordinates, end_coordinates, \
             start_position = args
 
-        # Create a deep copy of the protein for this process.
-        protein_copy = copy.deepcopy(protein)
+        # Copy the folding of the protein to the scratch protein.
+        protein_copy = self._get_scratch(protein)
 
         # Perform a breadth first search on the snippet.
-        search = BfsFold(protein_copy, self._dimensions)
-        options = search.get_possible_foldings(
-            snippet, start_coordinates, end_coordinates)
-
-        # Try all options and return the best score.
+        options = self._search.get_possible_positions(
+            length, start_coordinates, end_coordinates)
+
+        # The ends of the snippet stay in place, so the score of an option
+        # only changes by the bonds of the amino acids between them. The
+        # partial scores need a grid without overlap, otherwise every
+        # option is scored in full.
+        moved = range(start_position + 1, start_position + length - 1)
+        exact = len(protein_copy.get_grid()) == len(protein_copy)
+        if exact:
+            base_score = self._highscore[1] - \
+                protein_copy.get_partial_score(moved)
+
+        # Try all options and keep the best valid one. Every option is a walk
+        # between the fixed ends, so it is valid if it does not overlap.
         best_score = None
-        best_protein = protein
-        for list in options:
-            for index, acid in enumerate(list):
-                protein_copy.get_list()[start_position +
-                                        index].position = acid.position
-                protein_copy.reset_grid()
+        best_option = None
+        placed = None
+        for option in options:
+            positions = option[1:-1]
+            if not protein_copy.move_acids(moved.start, positions):
+                continue
+            placed = positions
+            if exact:
+                score = base_score + protein_copy.get_partial_score(moved)
+            else:
+                score = protein_copy.get_score()
+            if best_score is None or score < best_score:
+                best_score = score
+                best_option = positions
+
+        # Keep the original protein if none of the options is valid.
+        if best_option is None:
+            return protein, self._highscore[1]
+
+        # Only move the best option back if another one was placed after it.
+        if placed is not best_option:
+            protein_copy.move_acids(moved.start, best_option)
+
+        return protein_copy, best_score
+
+    def _get_scratch(self, protein: Protein) -> Protein:
+        """
+        Gets the scratch protein with the folding of the given protein.
 
-                # Check if the protein is valid.
-                if protein_copy.is_valid():
-                    score = protein_copy.get_score()
-                    if best_score is None or score < best_score:
-                        best_protein = protein_copy
+        Parameters:
+        - protein (Protein): The protein to copy the folding from.
 
-        return best_protein
+        Returns:
+        - Protein: The scratch protein.
+        """
+        if self._scratch is None:
+            self._scratch = Protein(str(protein))
+        self._scratch.set_positions([acid.position
+                                     for acid in protein.get_list()])
 
-    def _check_highscore(self, protein: Protein) -> bool:
+        return self._scratch
+
+    def _set_highscore(self, protein: Protein, score: int) -> None:
+        """
+        Makes the given protein the highscore. The scratch protein is swapped
+        with the old highscore, any other protein is copied.
+
+        Parameters:
+        - protein (Protein): The new highscore protein.
+        - score (int): The score of the protein.
+
+        Returns:
+        - None
+        """
+        if protein is self._scratch:
+            self._scratch = self._highscore[0]
+        else:
+            protein = copy.deepcopy(protein)
+        self._highscore = (protein, score)
+
+    def _check_highscore(self, protein: Protein,
+                         already_valid: bool = False,
+                         score: Optional[int] = None) -> bool:
         """
         Checks if the given protein is a new highscore.
 
         Parameters:
         - protein (Protein): The protein to check.
+        - already_valid (bool): Whether the grid of the protein is already
+          rebuilt and validated, so the check can be skipped.
+        - score (Optional[int]): The score of the protein if it is already
+          known.
 
         Returns:
         - bool: True if the protein is a new highscore, False otherwise.
         """
-        # Reset the grid.
-        protein.reset_grid()
-
-        # Check if the protein is a new highscore.
-        if protein.is_valid() and protein.get_score() < self._highscore[1]:
-            # Store a copy of the protein.
-            highscore = copy.deepcopy(protein)
-            self._highscore = (highscore, highscore.get_score())
+        # Reset the grid if the protein was not validated already.
+        if not already_valid:
+            protein.reset_grid()
+
+        # Compare the score first, it rejects most proteins before they
+        # need to be validated or copied.
+        if score is None:
+            score = protein.get_score()
+        if score >= self._highscore[1]:
+            return False
+
+        if already_valid or protein.is_valid():
+            self._set_highscore(protein, score)
             print(
                 f"New highscore found: {self._highscore[1]}.") if \
                 self._verbose else None
@@ -232,3 +438,25 @@ class HillclimberFold:
         - List[int]: The list of scores.
         """
         return self._scores
+
+
+def _experiment_worker(args: Tuple[Tuple[Protein, int], int, int]) -> \
+        Tuple[Protein, int]:
+    """
+    Runs a single hillclimber experiment in a worker process.
+
+    Parameters:
+    - args (Tuple[Tuple[Protein, int], int, int]): The highscore to start
+      from, the number of dimensions and the random seed of the experiment.
+
+    Returns:
+    - Tuple[Protein, int]: The highscore after the experiment.
+    """
+    highscore, dimensions, seed = args
+    random.seed(seed)
+
+    fold = HillclimberFold(highscore[0], dimensions, 1, [])
+    fold._highscore = highscore
+    fold._run_experiment(highscore[0])
+
+    return fold._highscore
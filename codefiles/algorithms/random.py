@@ -13,7 +13,6 @@ Docstrings: Generated by GitHub Copilot & OpenAI's GPT-4 model.
 """
 
 from typing import List, Optional, Tuple
-from operator import add, sub
 from ..classes.protein import Protein
 from ..classes.aminoacid import Aminoacid
 import random
@@ -38,12 +37,20 @@ class RandomFold:
         Sets the position of an amino acid in the folded protein.
     - backtracking(self, max_backtracking: int = 5000) -> None:
         Performs backtracking in case of failed folding attempts.
-    - _get_directions(self) -> List[Tuple[int, int, int]]:
-        Returns a list of possible directions for folding based on the number of dimensions.
+    - _get_directions(self) -> Tuple[Tuple[int, int, int], ...]:
+        Returns the possible directions for folding based on the number of dimensions.
     - get_random_direction(self, directions: List[Tuple[int, int, int]]) -> Tuple[int, int, int]:
         Returns a random direction from the given list of directions.
     """  # noqa
 
+    # The possible directions for folding, shared by all instances
+    directions_2d = ((1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0))
+    directions_3d = directions_2d + ((0, 0, 1), (0, 0, -1))
+
+    # The indices of the set bits of every 6-bit direction mask
+    set_bits = tuple(tuple(index for index in range(6) if mask >> index & 1)
+                     for mask in range(64))
+
     def __init__(self, protein: Protein, dimensions: int,
                  avoid_overlap: Optional[bool] = True,
                  verbose: Optional[bool] = False) -> None:
@@ -100,9 +107,9 @@ class RandomFold:
         """
         directions = self._get_directions()
         if acid.predecessor and acid.predecessor.position:
-            direction = random.choice(directions)
-            new_position = tuple(
-                map(add, acid.predecessor.position, direction))
+            x, y, z = acid.predecessor.position
+            dx, dy, dz = random.choice(directions)
+            new_position = (x + dx, y + dy, z + dz)
             acid.position = new_position
             self._protein.add_to_grid(new_position, acid)
 
@@ -122,7 +129,13 @@ class RandomFold:
         for _ in range(len(self._protein._sequence) - 1):
             protein_path.append((0, 0, 0))
 
+        # The directions still to try are kept as a bitmask over the
+        # directions, the reverse of a direction is its index XOR 1
         directions = self._get_directions()
+        direction_index = {direction: index
+                           for index, direction in enumerate(directions)}
+        full_mask = (1 << len(directions)) - 1
+        mask = full_mask
 
         print(
             f"{acid}[0]: {acid.position}") \
@@ -135,10 +148,11 @@ class RandomFold:
 
         while acid_index < len(self._protein._sequence) and acid is not None:
             if acid.predecessor:
-                while directions:
-                    random_direction = random.choice(directions)
-                    new_position = tuple(
-                        map(add, acid.predecessor.position, random_direction))
+                x, y, z = acid.predecessor.position
+                while mask:
+                    index = random.choice(self.set_bits[mask])
+                    dx, dy, dz = directions[index]
+                    new_position = (x + dx, y + dy, z + dz)
                     if self._protein.is_valid_fold(new_position):
                         acid.position = new_position
                         self._protein.add_to_grid(new_position, acid)
@@ -146,24 +160,20 @@ class RandomFold:
                         break
                     else:
                         # remove direction if not valid
-                        if random_direction in directions:
-                            directions.remove(random_direction)
+                        mask &= ~(1 << index)
 
-                if not directions:
+                if not mask:
                     # backtracking
-                    avoid_direction_path = tuple(
-                        map(sub, protein_path[acid_index - 2],
-                            protein_path[acid_index - 3]))
-                    avoid_direction_failed_path = tuple(
-                        map(sub, protein_path[acid_index - 1],
-                            protein_path[acid_index - 2]))
-                    directions = self._get_directions()
-
-                    if avoid_direction_path in directions:
-                        directions.remove(avoid_direction_path)
-
-                    if avoid_direction_failed_path in directions:
-                        directions.remove(avoid_direction_failed_path)
+                    x1, y1, z1 = protein_path[acid_index - 3]
+                    x2, y2, z2 = protein_path[acid_index - 2]
+                    x3, y3, z3 = protein_path[acid_index - 1]
+                    avoid_direction_path = (x2 - x1, y2 - y1, z2 - z1)
+                    avoid_direction_failed_path = (x3 - x2, y3 - y2, z3 - z2)
+                    mask = full_mask
+                    for avoid_direction in (avoid_direction_path,
+                                            avoid_direction_failed_path):
+                        if avoid_direction in direction_index:
+                            mask &= ~(1 << direction_index[avoid_direction])
 
                     print("backtracking needed") if self._verbose else None
                     acid_index -= 1
@@ -189,37 +199,30 @@ class RandomFold:
                         if self._verbose else None
 
             if not backtracking_bool:
-                if len(random_direction) == 3:
-                    x, y, z = random_direction
-                    avoid_direction = (-x, -y, -z)
-                    directions = self._get_directions()
-                    if avoid_direction in directions:
-                        directions.remove(avoid_direction)
-                    print(
-                        f"{acid}[{acid_index}]: {acid.position}")\
-                        if self._verbose else None
-                    acid_index += 1
-                    acid = acid.link
+                # Avoid going back in the direction that was just taken
+                mask = full_mask & ~(1 << (index ^ 1))
+                print(
+                    f"{acid}[{acid_index}]: {acid.position}")\
+                    if self._verbose else None
+                acid_index += 1
+                acid = acid.link
             backtracking_bool = False
 
         print(protein_path) if self._verbose else None
 
-    def _get_directions(self) -> List[Tuple[int, int, int]]:
+    def _get_directions(self) -> Tuple[Tuple[int, int, int], ...]:
         """
-        Returns a list of possible directions for folding based on the number of dimensions.
+        Returns the possible directions for folding based on the number of dimensions.
+        The tuple is shared, copy it to a list before changing it.
 
         Returns:
-        - List[Tuple[int, int, int]]: A list of possible directions for folding.
+        - Tuple[Tuple[int, int, int], ...]: The possible directions for folding.
         """  # noqa
         if self._dimensions == 2:
-            return [(1, 0, 0),
-                    (-1, 0, 0),
-                    (0, 1, 0),
-                    (0, -1, 0)]
+            return self.directions_2d
         elif self._dimensions == 3:
-            return [(1, 0, 0), (-1, 0, 0), (0, 1, 0),
-                    (0, -1, 0), (0, 0, 1), (0, 0, -1)]
-        return []
+            return self.directions_3d
+        return ()
 
     def get_random_direction(
         self, directions: List[Tuple[int, int, int]]
@@ -8,7 +8,8 @@ Docstrings: Generated by GitHub Copilot.
 """
 
 from ..classes.protein import Protein
-from typing import List, Tuple
+import numpy as np
+from typing import Tuple
 
 
 class SpiralFold:
@@ -16,7 +17,7 @@ class SpiralFold:
     Represents a folding algorithm that folds a protein in a spiral pattern.
 
     Attributes:
-    - movements (List[Tuple[int, int, int]]): The list of movements in the spiral pattern.
+    - movements (Tuple[Tuple[int, int, int], ...]): The movements in the spiral pattern.
 
     Methods:
     - __init__(self, protein: Protein, dimensions: int) -> None: Initializes a
@@ -25,9 +26,9 @@ class SpiralFold:
         folded protein.
     """  # noqa
 
-    movements: List[Tuple[int, int, int]] = [
+    movements: Tuple[Tuple[int, int, int], ...] = (
         (0, 1, 0), (1, 0, 0), (0, -1, 0), (-1, 0, 0)
-    ]
+    )
 
     def __init__(self, protein: Protein, dimensions: int) -> None:
         """
@@ -46,7 +47,6 @@ class SpiralFold:
 
         self._protein = protein
         self._dimensions = dimensions
-        self._steps: int = 1
 
     def run(self) -> Protein:
         """
@@ -58,34 +58,21 @@ class SpiralFold:
         Raises:
         - ValueError: If a valid folding for the protein cannot be found.
         """
-        # Add the first amino acid to the grid.
-        current = self._protein.get_head()
-        self._protein.add_to_grid(current.position, current)
-
-        # Initialize a movement index and move to the next amino acid.
-        movement_index: int = 0
-        current = current.link
-
-        # Keep setting positions until a valid folding is found.
-        while not self._protein.is_valid():
-
-            # Set the position of self._steps amino acids in the current
-            # direction.
-            for _ in range(self._steps):
-                current.position = tuple(
-                    sum(x) for x in zip(current.predecessor.position,
-                                        SpiralFold.movements[movement_index])
-                )
-                self._protein.add_to_grid(current.position, current)
-
-                # If the end of the protein is reached, stop.
-                if current.link is None:
-                    break
-                current = current.link
-
-            # Change the direction and increase the number of steps.
-            movement_index = (movement_index + 1) % len(SpiralFold.movements)
-            self._steps += 1 if movement_index % 2 == 0 else 0
+        length = len(self._protein)
+
+        # The spiral takes runs of 1, 1, 2, 2, 3, 3, ... steps, turning to
+        # the next movement after every run. Build the movement of every
+        # amino acid after the first at once and sum them into positions.
+        runs = np.arange(length)
+        movement_indices = np.repeat(
+            runs % len(SpiralFold.movements), runs // 2 + 1
+        )[:length - 1]
+        positions = np.cumsum(
+            np.array(SpiralFold.movements)[movement_indices], axis=0
+        )
+        self._protein.set_positions(
+            np.vstack((np.zeros((1, 3), dtype=int), positions))
+        )
 
         if not self._protein.is_valid():
             raise ValueError(
@@ -8,7 +8,8 @@ Docstrings: Generated by GitHub Copilot.
 """
 
 from ..classes.protein import Protein
-from typing import List, Tuple
+import numpy as np
+from typing import Tuple
 
 
 class ZigzagFold:
@@ -16,7 +17,7 @@ class ZigzagFold:
     Represents a folding algorithm that folds a protein in a zigzag pattern.
 
     Attributes:
-    - movements (List[Tuple[int, int, int]]): The possible movements in the grid.
+    - movements (Tuple[Tuple[int, int, int], ...]): The movements of the zigzag, in order.
 
     Methods:
     - __init__(self, protein: Protein, dimensions: int) -> None: Initializes a
@@ -25,9 +26,11 @@ class ZigzagFold:
         folded protein.
     """  # noqa
 
-    movements: List[Tuple[int, int, int]] = [
+    # Right, up, left, up: the second up is not a mistake, with a down
+    # instead the pattern would close into a square and collide
+    movements: Tuple[Tuple[int, int, int], ...] = (
         (1, 0, 0), (0, 1, 0), (-1, 0, 0), (0, 1, 0)
-    ]
+    )
 
     def __init__(self, protein: Protein, dimensions: int) -> None:
         """
@@ -57,27 +60,17 @@ class ZigzagFold:
         Raises:
         - ValueError: If a valid folding for the protein cannot be found.
         """
-        current = self._protein.get_list()
-        self._protein.add_to_grid(current.position, current)
-
-# Initialize the movement index.
-        movement_index: int = 0
-
-# Fold the protein until it is valid.
-        while not self._protein.is_valid():
-            current = current.link
-
-# Add the movement to the position of the previous amino acid.
-            current.position = tuple(
-                sum(x) for x in zip(current.position,
-                                    current.predecessor.position,
-                                    ZigzagFold.movements[movement_index])
-            )
-
-# Add the amino acid to the grid and increase the movement index,
-            # looping back when it reaches the end of the list.
-            self._protein.add_to_grid(current.position, current)
-            movement_index = (movement_index + 1) % len(ZigzagFold.movements)
+        length = len(self._protein)
+
+# The zigzag repeats the movements, so the movement of every amino acid
+        # after the first is known up front. Sum them into positions at once.
+        movement_indices = np.arange(length - 1) % len(ZigzagFold.movements)
+        positions = np.cumsum(
+            np.array(ZigzagFold.movements)[movement_indices], axis=0
+        )
+        self._protein.set_positions(
+            np.vstack((np.zeros((1, 3), dtype=int), positions))
+        )
 
         if not self._protein.is_valid():
             raise ValueError(
@@ -1,6 +1,6 @@
 # Docstrings generated by GitHub Copilot
 
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 
 class Aminoacid:
@@ -8,6 +8,8 @@ class Aminoacid:
     Represents an amino acid in a protein sequence.
 
     Attributes:
+    - stability_scores (Dict[str, Dict[str, int]]): The stability score of
+        every pair of amino acid types.
     - position (Tuple[int, int, int]): The position of the amino acid in
         3D space.
     - predecessor (Optional[Aminoacid]): The previous amino acid in the
@@ -27,6 +29,16 @@ class Aminoacid:
         Returns a string representation of the amino acid.
     """
 
+    # Amino acids only have these attributes, without an instance dict they
+    # take less memory and their attributes are found faster
+    __slots__ = ("position", "predecessor", "link", "_type")
+
+    stability_scores: Dict[str, Dict[str, int]] = {
+        "H": {"H": -1, "P": 0, "C": -1},
+        "P": {"H": 0, "P": 0, "C": 0},
+        "C": {"H": -1, "P": 0, "C": -5},
+    }
+
     def __init__(self, type: str, predecessor: Optional["Aminoacid"] = None,
                  link: Optional["Aminoacid"] = None) -> None:
         """
@@ -63,19 +75,7 @@ class Aminoacid:
         Returns:
         - int: The stability score between the two amino acids.
         """
-        self_type = self.get_type()
-        other_type = other.get_type()
-
-        if self_type == "P" or other_type == "P":
-            return 0
-
-        if self_type == "H" or other_type == "H":
-            return -1
-
-        if self_type == "C":
-            return -5
-
-        return 0
+        return Aminoacid.stability_scores[self._type][other._type]
 
     def __str__(self) -> str:
         """
@@ -1,8 +1,10 @@
 # Docstrings generated by GitHub Copilot
 
 from .aminoacid import Aminoacid
-from operator import sub
-import csv
+from ..helpers.bonds import bond_score_matrix
+from ..helpers.score import score_folding
+import os
+import numpy as np
 from typing import Dict, List, Tuple, Optional, Union
 
 
@@ -25,6 +27,8 @@ class Protein:
         double linked list of amino acids.
     - get_score(self) -> int: Calculates and returns the stability score of
         the protein.
+    - get_partial_score(self, indices: range) -> int: Calculates the part of
+        the stability score that comes from bonds with some amino acids.
     - get_folding(self) -> List[Dict[str, Union[str, int]]]: Returns the
         folding information of the protein.
     - create_csv(self, filename: str, verbose: bool = False) -> None:
@@ -45,6 +49,15 @@ class Protein:
     - remove_from_grid(self, position: Tuple[int, int, int]) -> None: Removes
         an amino acid from the grid.
     - reset_grid(self) -> None: Resets the grid representation of the protein.
+    - reset_positions(self) -> None: Moves all amino acids back to the origin
+        and empties the grid.
+    - get_positions(self) -> np.ndarray: Returns the positions of all amino
+        acids as an array.
+    - set_positions(self, positions: np.ndarray) -> None: Sets the positions
+        of all amino acids and rebuilds the grid.
+    - move_acids(self, start: int, positions: List[Tuple[int, int, int]])
+        -> bool: Moves a run of amino acids and updates their part of the
+        grid.
     - __str__(self) -> str: Returns the sequence of the protein.
     - __len__(self) -> int: Returns the length of the protein.
     - __getstate__(self) -> Tuple[str, List[Aminoacid],
@@ -55,6 +68,15 @@ class Protein:
         Sets the state of the protein from pickling.
     """
 
+    # The positions next to a position on the grid, relative to it
+    adjacent_positions: Tuple[Tuple[int, int, int], ...] = (
+        (1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)
+    )
+
+    # The score of every pair of amino acids, per sequence, shared by all
+    # proteins with that sequence
+    bond_scores: Dict[str, np.ndarray] = {}
+
     def __init__(self, sequence: str) -> None:
         """
         Initializes a new instance of the Protein class.
@@ -78,20 +100,16 @@ class Protein:
         if not self._sequence:
             return None
 
-        # Create the first amino acid in the sequence
-        head = Aminoacid(type=self._sequence[0])
-        current = head
-        self._list.append(current)
+        # Create all amino acids in one go so they are allocated together
+        self._list = [Aminoacid(type=amino_type)
+                      for amino_type in self._sequence]
 
-        # Create the rest of the amino acids in the sequence
-        for _, amino_type in enumerate(self._sequence[1:], start=1):
-            new_aminoacid = Aminoacid(
-                type=amino_type, predecessor=current)
-            current.link = new_aminoacid
-            current = new_aminoacid
-            self._list.append(current)
+        # Link every amino acid to the one before it
+        for predecessor, current in zip(self._list, self._list[1:]):
+            predecessor.link = current
+            current.predecessor = predecessor
 
-        return head
+        return self._list[0]
 
     def get_score(self) -> int:
         """
@@ -100,39 +118,97 @@ class Protein:
         Returns:
         - int: The stability score of the protein.
         """
-        self._score = 0
+        grid = self._grid
+
+        # When the grid holds exactly every amino acid at its position, score
+        # the positions in compiled code, the loop below is for foldings
+        # that overlap or are not placed completely
+        if len(grid) == len(self._list) and all(
+                grid.get(acid.position) is acid for acid in self._list):
+            bond_scores = Protein.bond_scores.get(self._sequence)
+            if bond_scores is None:
+                bond_scores = Protein.bond_scores[self._sequence] = \
+                    bond_score_matrix(self._sequence)
+
+            self._score = 2 * score_folding(self.get_positions(), bond_scores)
+            return self._score // 2
 
-        # Define the adjacent positions to the current amino acid
-        adjacent_positions = [(1, 0, 0), (-1, 0, 0),
-                              (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
+        score = 0
+        adjacent_positions = Protein.adjacent_positions
 
         for current in self._list:
 
+            # Polar amino acids do not add to the score
+            if current.get_type() == "P":
+                continue
+            stability_scores = Aminoacid.stability_scores[current.get_type()]
+
             # Get the positions of the amino acids connected to the current
             # amino acid
-            connections = [node.position for node in [current.predecessor,
-                                                      current.link]
-                           if node and node.position]
-
-            # Check if the adjacent positions are not yet in the connections
-            check_positions = [(c + adj[0], d + adj[1], e + adj[2]) for
-                               (c, d, e), adj in zip([current.position] *
-                                                     len(adjacent_positions),
-                                                     adjacent_positions) if
-                               (c + adj[0], d + adj[1], e + adj[2]) not in
-                               connections]
-
-            # Add the stability score of the current amino acid to the
-            # total score
-            for pos_tuple in check_positions:
-                if pos_tuple in self._grid:
-                    self._score += current.get_stability_score(
-                        self._grid[pos_tuple])
+            connections = [node.position for node in (current.predecessor,
+                                                      current.link)
+                           if node is not None]
+
+            # Add the stability score of every amino acid next to the
+            # current one that it is not connected to
+            x, y, z = current.position
+            for dx, dy, dz in adjacent_positions:
+                position = (x + dx, y + dy, z + dz)
+                if position in connections:
+                    continue
+                other = grid.get(position)
+                if other is not None:
+                    score += stability_scores[other.get_type()]
+
+        self._score = score
 
         # Return the total score divided by 2 since every connection is
         # counted twice
         return (self._score // 2)
 
+    def get_partial_score(self, indices: range) -> int:
+        """
+        Calculates the part of the stability score that comes from bonds with
+        the amino acids at the given indices. The grid has to hold every
+        amino acid at its position.
+
+        The change in score when only these amino acids move is their partial
+        score after the move minus the one before it.
+
+        Parameters:
+        - indices (range): The indices of the amino acids.
+
+        Returns:
+        - int: The score of every bond with at least one of the amino acids.
+        """
+        grid = self._grid
+        acids = self._list[indices.start:indices.stop]
+        selected = set(acids)
+        score = 0
+
+        for current in acids:
+
+            # Polar amino acids do not add to the score
+            if current.get_type() == "P":
+                continue
+            stability_scores = Aminoacid.stability_scores[current.get_type()]
+
+            x, y, z = current.position
+            for dx, dy, dz in Protein.adjacent_positions:
+                other = grid.get((x + dx, y + dy, z + dz))
+                if other is None or other is current.predecessor or \
+                        other is current.link:
+                    continue
+
+                # Bonds between two of the amino acids are found from both,
+                # so each side counts half
+                if other in selected:
+                    score += stability_scores[other.get_type()]
+                else:
+                    score += 2 * stability_scores[other.get_type()]
+
+        return score // 2
+
     def get_folding(self) -> List[Dict[str, Union[str, int]]]:
         """
         Returns the folding information of the protein.
@@ -142,29 +218,21 @@ class Protein:
             protein.
         """
         folding: List[Dict[str, Union[str, int]]] = []
-        current = self._head
 
         # Return empty list if the protein is empty
-        if current is None or current.link is None:
+        if len(self._list) < 2:
             return folding
 
-        # Get the folding information of the protein
-        while current is not None:
-
-            # Set the fold to 0 if the current amino acid is the last one
-            if current.link is None:
-                fold = 0
-
-            # Calculate the fold based on the difference between the current
-            # and next amino acid
-            else:
-                next_amino = current.link
-                difference = tuple(
-                    map(sub, next_amino.position, current.position))
-                fold = difference[0] + 2 * difference[1] + 3 * difference[2]
-
+        # Calculate the fold based on the difference between every amino
+        # acid and the next one, scanning the list pairwise
+        for current, next_amino in zip(self._list, self._list[1:]):
+            (x, y, z), (next_x, next_y, next_z) = (current.position,
+                                                   next_amino.position)
+            fold = (next_x - x) + 2 * (next_y - y) + 3 * (next_z - z)
             folding.append({'amino': current.get_type(), 'fold': fold})
-            current = current.link
+
+        # Set the fold to 0 for the last amino acid
+        folding.append({'amino': self._list[-1].get_type(), 'fold': 0})
 
         return folding
 
@@ -176,22 +244,21 @@ class Protein:
         - filename (str): The name of the CSV file.
         - verbose (bool): Whether to print a message when the file is created.
         """
+        # Make sure the folder of the file exists
+        folder = os.path.dirname(filename)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
         # Create the CSV file
         with open(filename, 'w', newline='') as file:
 
-            # Define the header and writer
-            header = ["amino", "fold"]
-            writer = csv.DictWriter(file, fieldnames=header)
-
-            # Retrieve the folding information
-            folding = self.get_folding()
-
-            # Add the score to the folding information
-            folding.append({'amino': 'score', 'fold': self.get_score()})
-
-            # Write the folding information to the CSV file
-            writer.writeheader()
-            writer.writerows(folding)
+            # Write the folding information and the score to the CSV file,
+            # the rows need no quoting, so they are formatted as one string
+            # with the line ending of csv.writer
+            file.write("amino,fold\r\n" + "".join(
+                f"{row['amino']},{row['fold']}\r\n"
+                for row in self.get_folding()
+            ) + f"score,{self.get_score()}\r\n")
             print(f"{filename} created.") if verbose else None
 
     def is_valid(self) -> bool:
@@ -201,11 +268,13 @@ class Protein:
         Returns:
         - bool: True if the protein is valid, False otherwise.
         """
-        for index in range(len(self._list) - 1):
-            for i in range(3):
-                if abs(self._list[index].position[i] -
-                       self._list[index + 1].position[i]) > 1:
-                    return False
+        # Check if every amino acid is next to the one before it
+        for current, next_amino in zip(self._list, self._list[1:]):
+            (x, y, z), (next_x, next_y, next_z) = (current.position,
+                                                   next_amino.position)
+            if abs(next_x - x) > 1 or abs(next_y - y) > 1 or \
+                    abs(next_z - z) > 1:
+                return False
 
         # Check if every amino acid has a different position
         return len(self._grid) == len(self._sequence)
@@ -290,14 +359,97 @@ class Protein:
         """
         Resets the grid representation of the protein.
         """
-        # Clear the grid
+        # Clear the grid and add back all the positions of the amino acids
+        self._grid.clear()
+        self._grid.update({acid.position: acid for acid in self._list})
+
+    def reset_positions(self) -> None:
+        """
+        Moves all amino acids back to the origin and empties the grid, so the
+        protein can be folded again without being rebuilt.
+        """
+        for acid in self._list:
+            acid.position = (0, 0, 0)
+        self._grid.clear()
+
+    def get_positions(self) -> np.ndarray:
+        """
+        Returns the positions of all amino acids as an array, in the order
+        of the sequence.
+
+        Returns:
+        - np.ndarray: An (N, 3) integer array with the position of every
+            amino acid.
+        """
+        return np.array([acid.position for acid in self._list],
+                        dtype=np.int64).reshape(-1, 3)
+
+    def set_positions(self, positions: np.ndarray) -> None:
+        """
+        Sets the positions of all amino acids at once and rebuilds the grid,
+        so a folding can be computed on an array and written back in one
+        pass.
+
+        Parameters:
+        - positions (np.ndarray): An (N, 3) array or a list of N positions,
+            in the order of the sequence.
+
+        Raises:
+        - ValueError: If the number of positions does not match the length of
+            the protein.
+        """
+        # Lists of tuples are taken as they are, only arrays are converted
+        if isinstance(positions, np.ndarray):
+            positions = positions.tolist()
+        positions = [tuple(position) for position in positions]
+        if len(positions) != len(self._list):
+            raise ValueError(
+                f"Expected {len(self._list)} positions, got {len(positions)}")
+
         self._grid.clear()
+        for acid, position in zip(self._list, positions):
+            acid.position = position
+            self._grid[position] = acid
 
-        # Add back all the positions of the amino acids
-        current = self.get_head()
-        while current:
-            self._grid[current.position] = current
-            current = current.link
+    def move_acids(self, start: int,
+                   positions: List[Tuple[int, int, int]]) -> bool:
+        """
+        Moves a run of amino acids to new positions and only updates their
+        part of the grid. The amino acids next to the run have to stay
+        adjacent to it, so only overlaps are checked.
+
+        If the new positions overlap, the amino acids are moved back. A grid
+        with overlapping amino acids is tolerated, a cell is only freed or
+        taken back by the amino acid it holds.
+
+        Parameters:
+        - start (int): The index of the first amino acid to move.
+        - positions (List[Tuple[int, int, int]]): The new positions of the
+            amino acids from the start onwards.
+
+        Returns:
+        - bool: True if the amino acids were moved without overlap, False if
+            they were moved back.
+        """
+        acids = self._list[start:start + len(positions)]
+        old_positions = [acid.position for acid in acids]
+        for acid, position in zip(acids, old_positions):
+            if self._grid.get(position) is acid:
+                del self._grid[position]
+
+        for index, (acid, position) in enumerate(zip(acids, positions)):
+            if position in self._grid:
+                # Undo the amino acids placed so far and put the run back
+                for placed in positions[:index]:
+                    del self._grid[placed]
+                for moved, old_position in zip(acids, old_positions):
+                    moved.position = old_position
+                    self._grid.setdefault(old_position, moved)
+                return False
+            acid.position = position
+            self._grid[position] = acid
+
+        return True
 
     def __str__(self) -> str:
         """
@@ -1,10 +1,46 @@
 import csv
+import os
+import random
+import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from statistics import fmean
+from typing import List, Optional, Tuple
 from codefiles.algorithms.annealing import AnnealingFold
 from codefiles.classes.protein import Protein
 
 
-def generate_data(dimensions: int, C: bool) -> None:
+def _run_fold(args: Tuple[str, int, int, str]) -> List[int]:
+    """
+    Fold a protein with AnnealingFold in a worker process.
+
+    Parameters
+    ----------
+    args : Tuple[str, int, int, str]
+        The protein sequence, the number of dimensions, the random seed of the run and the file to write the rows of the run to.
+
+    Returns
+    -------
+    List[int]
+        The score of every iteration.
+    """  # noqa
+    sequence, dimensions, seed, outputfile = args
+    random.seed(seed)
+
+    # Empty the output file, the algorithm appends to it
+    with open(outputfile, "w", newline=""):
+        pass
+
+    scores: List[int] = []
+    test_protein: Protein = Protein(sequence)
+    test = AnnealingFold(
+        test_protein, dimensions, 1000, scores, outputfile)
+    test.run()
+    return test.get_scores()
+
+
+def generate_data(dimensions: int, C: bool,
+                  workers: Optional[int] = None) -> None:
     """
     Generate a baseline for a protein folding problem.
 
@@ -14,6 +50,8 @@ def generate_data(dimensions: int, C: bool) -> None:
         The number of dimensions in which the protein folding will be simulated.
     C : bool
         A boolean indicating whether the protein sequence includes cysteine (C) or not.
+    workers : Optional[int]
+        The number of processes to fold in, by default one per CPU.
     """  # noqa
     # Set the input and output filenames
     if C:
@@ -23,40 +61,35 @@ def generate_data(dimensions: int, C: bool) -> None:
         filename: str = "data/input/sequences_H_P.csv"
         outputfile: str = f"data/output/annealing_data/{dimensions}D.csv"
 
-    # Empty the output file
-    with open(outputfile, "w") as file:
-        pass
+    # Make sure the folder of the output file exists
+    os.makedirs(os.path.dirname(outputfile), exist_ok=True)
 
+    # Read the file line by line until an empty line is reached
+    sequences: List[str] = []
     with open(filename, "r") as file:
-        reader = csv.reader(file)
-        line_number: int = 0
-
-        # Read the file line by line until an empty line is reached
-        for row in reader:
+        for row in csv.reader(file):
             if not row:
                 break
-
-            # Create Protein objects for each sequence
-            sequence: str = row[0]
-
-            scores = []
-
-            test_protein: Protein = Protein(sequence)
-            test = AnnealingFold(
-                test_protein, dimensions, 1000, scores, outputfile)
-            test_protein = test.run()
-            scores = test.get_scores()
-
-            # Write the average score to the output file
-            with open(outputfile, "a") as file:
-                writer = csv.writer(file)
-                writer.writerow([])
-                writer.writerow(
-                    ["Average:", f"{sum(scores) / len(scores)}"])
-                writer.writerow([])
-                writer.writerow([])
-
-            line_number += 1
+            sequences.append(row[0])
+
+    # Fold every sequence in parallel, each into its own part of the output
+    parts = [f"{outputfile}.{line_number}"
+             for line_number in range(len(sequences))]
+    jobs = [(sequence, dimensions, random.randrange(2 ** 32), part)
+            for sequence, part in zip(sequences, parts)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        all_scores = list(executor.map(_run_fold, jobs))
+
+    # Join the parts in order, each followed by its average score
+    with open(outputfile, "w", buffering=1 << 20, newline="") as output:
+        writer = csv.writer(output)
+        for part, scores in zip(parts, all_scores):
+            with open(part, "r", newline="") as file:
+                shutil.copyfileobj(file, output)
+            os.remove(part)
+
+            writer.writerows(
+                [[], ["Average:", f"{fmean(scores)}"], [], []])
 
 
 def main() -> None:
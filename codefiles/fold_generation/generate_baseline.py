@@ -1,10 +1,16 @@
 import csv
+import os
 import sys
+from typing import Optional
+import numpy as np
+from numba import set_num_threads
 from ..algorithms.random import RandomFold
-from ..classes.protein import Protein
+from ..helpers.bonds import bond_score_matrix
+from ..helpers.kernels import random_foldings, score_rollouts
 
 
-def generate_baseline(dimensions: int, C: bool) -> None:
+def generate_baseline(dimensions: int, C: bool,
+                      workers: Optional[int] = None) -> None:
     """
     Generate a baseline for a protein folding problem.
 
@@ -14,6 +20,8 @@ def generate_baseline(dimensions: int, C: bool) -> None:
         The number of dimensions in which the protein folding will be simulated.
     C : bool
         A boolean indicating whether the protein sequence includes cysteine (C) or not.
+    workers : Optional[int]
+        The number of threads to fold in, by default one per CPU.
 
     """
     # Set the input and output filenames
@@ -24,12 +32,22 @@ def generate_baseline(dimensions: int, C: bool) -> None:
         filename: str = "data/input/sequences_H_P.csv"
         outputfile: str = f"data/output/baseline/{dimensions}D.csv"
 
-    # Empty the output file
-    with open(outputfile, "w") as file:
-        pass
+    # Make sure the folder of the output file exists
+    os.makedirs(os.path.dirname(outputfile), exist_ok=True)
 
-    with open(filename, "r") as file:
+    if workers is not None:
+        set_num_threads(workers)
+
+    # The directions RandomFold folds in
+    move_deltas = np.array(RandomFold.directions_3d[:2 * dimensions],
+                           dtype=np.int64)
+
+    # Open the output file once, emptying it, and keep it open for all
+    # runs, with a 1 MiB buffer so the rows reach the disk in few writes
+    with open(filename, "r") as file, \
+            open(outputfile, "w", buffering=1 << 20, newline="") as output:
         reader = csv.reader(file)
+        writer = csv.writer(output)
         line_number: int = 0
 
         # Read the file line by line until an empty line is reached
@@ -37,31 +55,30 @@ def generate_baseline(dimensions: int, C: bool) -> None:
             if not row:
                 break
 
-            # Create Protein objects for each sequence
+            # The sequence of the protein to fold
             sequence: str = row[0]
 
-            scores = []
+            bond_scores = bond_score_matrix(sequence)
+            scores = np.empty(10**5, dtype=np.int64)
 
-            # Run the algorithm 10**5 times and write the results to the output file
-            for iteration in range(10**5):
-                test_protein: Protein = Protein(sequence)
-                test = RandomFold(test_protein, dimensions, True)
-                test_protein = test.run()
-                scores.append(test_protein.get_score())
+            # Fold the protein 10**5 times at random, 1000 foldings at a
+            # time, and write the results to the output file in order
+            for start in range(0, 10**5, 1000):
+                coordinates = random_foldings(len(sequence), 1000,
+                                              move_deltas, 5000)
+                scores[start:start + 1000] = score_rollouts(coordinates,
+                                                            bond_scores)
+                batch = scores[start:start + 1000].tolist()
 
-                with open(outputfile, "a") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(
-                        [iteration, str(test_protein), test_protein.get_score()])
+                # The rows need no quoting, so they are formatted as one
+                # string with the line ending of csv.writer
+                output.write("".join(
+                    f"{start + iteration},{sequence},{score}\r\n"
+                    for iteration, score in enumerate(batch)))
 
             # Write the average score to the output file
-            with open(outputfile, "a") as file:
-                writer = csv.writer(file)
-                writer.writerow([])
-                writer.writerow(
-                    ["Average:", f"{sum(scores) / len(scores)}"])
-                writer.writerow([])
-                writer.writerow([])
+            writer.writerows(
+                [[], ["Average:", f"{scores.mean()}"], [], []])
 
             line_number += 1
 
@@ -1,5 +1,7 @@
 import csv
+import os
 import sys
+from statistics import fmean
 from codefiles.algorithms.bfs_random import Bfs_randomFold
 from codefiles.classes.protein import Protein
 import time
@@ -25,12 +27,15 @@ def generate_bfs(dimensions: int, C: bool) -> None:
         filename: str = "data/input/sequences_H_P.csv"
         outputfile: str = f"data/output/bfs/{dimensions}D.csv"
 
-    # Empty the output file
-    with open(outputfile, "w") as file:
-        pass
+    # Make sure the folder of the output file exists
+    os.makedirs(os.path.dirname(outputfile), exist_ok=True)
 
-    with open(filename, "r") as file:
+    # Open the output file once, emptying it, and keep it open for all
+    # runs, with a 1 MiB buffer so the rows reach the disk in few writes
+    with open(filename, "r") as file, \
+            open(outputfile, "w", buffering=1 << 20, newline="") as output:
         reader = csv.reader(file)
+        writer = csv.writer(output)
         line_number: int = 0
 
         # Read the file line by line until an empty line is reached
@@ -42,27 +47,24 @@ def generate_bfs(dimensions: int, C: bool) -> None:
             sequence: str = row[0]
 
             scores = []
+            rows = []
 
-            # Run the algorithm 10**5 times and write the results to the output file
+            # Run the algorithm 10**3 times and write the results to the
+            # output file at once
             for iteration in range(10**3):
                 test_protein: Protein = Protein(sequence)
                 test = Bfs_randomFold(test_protein, dimensions)
                 test_protein = test.run()
-                scores.append(test_protein.get_score())
+                score: int = test_protein.get_score()
+                scores.append(score)
 
-                with open(outputfile, "a") as file:
-                    writer = csv.writer(file)
-                    writer.writerow(
-                        [iteration, str(test_protein), test_protein.get_score()])
+                rows.append([iteration, str(test_protein), score])
+
+            writer.writerows(rows)
 
             # Write the average score to the output file
-            with open(outputfile, "a") as file:
-                writer = csv.writer(file)
-                writer.writerow([])
-                writer.writerow(
-                    ["Average:", f"{sum(scores) / len(scores)}"])
-                writer.writerow([])
-                writer.writerow([])
+            writer.writerows(
+                [[], ["Average:", f"{fmean(scores)}"], [], []])
 
             line_number += 1
 
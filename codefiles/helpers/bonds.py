@@ -0,0 +1,73 @@
+from typing import Tuple
+import numpy as np
+
+# The positions next to a position on the grid, relative to it
+adjacent_positions = ((1, 0, 0), (-1, 0, 0), (0, 1, 0),
+                      (0, -1, 0), (0, 0, 1), (0, 0, -1))
+
+
+def bond_midpoints(positions: np.ndarray,
+                   sequence: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the bonds between amino acids that lie next to each other on the grid without being connected in the chain.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        The positions of the amino acids, shaped (length, 3).
+    sequence : str
+        The types of the amino acids.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The midpoints of the H-H and H-C bonds and the midpoints of the C-C bonds, each shaped (bonds, 3).
+    """
+    index_at = {position: index
+                for index, position in enumerate(map(tuple, positions.tolist()))}
+    h_bonds, c_bonds = [], []
+
+    # Look up the neighbours of every amino acid that can bond, a pair is
+    # only counted from its first amino acid and not when it is connected
+    for index, (position, amino_type) in enumerate(
+            zip(positions.tolist(), sequence)):
+        if amino_type == "P":
+            continue
+
+        x, y, z = position
+        for dx, dy, dz in adjacent_positions:
+            other = index_at.get((x + dx, y + dy, z + dz))
+            if other is None or other <= index + 1 or sequence[other] == "P":
+                continue
+
+            midpoint = (x + dx / 2, y + dy / 2, z + dz / 2)
+            if amino_type == "C" and sequence[other] == "C":
+                c_bonds.append(midpoint)
+            else:
+                h_bonds.append(midpoint)
+
+    return (np.array(h_bonds, dtype=float).reshape(-1, 3),
+            np.array(c_bonds, dtype=float).reshape(-1, 3))
+
+
+def bond_score_matrix(sequence: str) -> np.ndarray:
+    """
+    Get the score of every pair of amino acids if they lie next to each other.
+
+    Parameters
+    ----------
+    sequence : str
+        The types of the amino acids.
+
+    Returns
+    -------
+    np.ndarray
+        The scores, shaped (length, length): -1 for H with H or C and -5 for C with C.
+        Only the pairs above the second diagonal are filled, so connected amino acids and pairs counted twice are left out.
+    """
+    types = np.frombuffer(sequence.encode("ascii"), np.uint8)
+    h_mask, c_mask = types == ord("H"), types == ord("C")
+    bonding = h_mask | c_mask
+
+    return np.triu(-np.outer(bonding, bonding).astype(np.int64)
+                   - 4 * np.outer(c_mask, c_mask), k=2)
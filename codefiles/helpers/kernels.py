@@ -0,0 +1,330 @@
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+
+@njit(cache=True)
+def _occupancy(length: int, directions: int) -> np.ndarray:
+    """
+    Make an empty occupancy bitmap of the positions a walk can reach.
+
+    Parameters
+    ----------
+    length : int
+        The number of amino acids of the walk.
+    directions : int
+        The number of directions, 4 for walks in 2D.
+
+    Returns
+    -------
+    np.ndarray
+        One bit for every position at most `length` steps from the start of
+        the walk, see `_cell`.
+    """
+    size = 2 * length + 1
+    depth = size if directions > 4 else 1
+    return np.zeros((size * size * depth + 63) >> 6, dtype=np.uint64)
+
+
+@njit(cache=True)
+def _cell(x: int, y: int, z: int, length: int, directions: int) -> int:
+    """
+    Get the bit of a position in an occupancy bitmap made by `_occupancy`.
+
+    Parameters
+    ----------
+    x, y, z : int
+        The position, relative to the start of the walk.
+    length : int
+        The number of amino acids of the walk.
+    directions : int
+        The number of directions, 4 for walks in 2D.
+
+    Returns
+    -------
+    int
+        The index of the bit of the position.
+    """
+    size = 2 * length + 1
+    depth = size if directions > 4 else 1
+    return ((x + length) * size + y + length) * depth + (z + length) % depth
+
+
+@njit("float64[::1](int64[:, :, ::1], int64[:, ::1])", parallel=True,
+      cache=True)
+def score_rollouts(coordinates: np.ndarray,
+                   bond_scores: np.ndarray) -> np.ndarray:
+    """
+    Score a batch of foldings by their contacts between amino acids.
+
+    Parameters
+    ----------
+    coordinates : np.ndarray
+        The positions of the amino acids, shaped (foldings, length, 3).
+    bond_scores : np.ndarray
+        The score of every pair of amino acids, shaped (length, length).
+        Only the pairs above the second diagonal are used, so connected
+        amino acids and pairs counted twice are left out.
+
+    Returns
+    -------
+    np.ndarray
+        The score of every folding.
+    """
+    foldings, length = coordinates.shape[0], coordinates.shape[1]
+    scores = np.zeros(foldings)
+
+    for folding in prange(foldings):
+        score = 0
+        for i in range(length - 3):
+            # Amino acids an even number of steps apart are never adjacent
+            for j in range(i + 3, length, 2):
+                if bond_scores[i, j] == 0:
+                    continue
+                distance = (
+                    abs(coordinates[folding, i, 0] - coordinates[folding, j, 0])
+                    + abs(coordinates[folding, i, 1] - coordinates[folding, j, 1])
+                    + abs(coordinates[folding, i, 2] - coordinates[folding, j, 2])
+                )
+                if distance == 1:
+                    score += bond_scores[i, j]
+        scores[folding] = score
+
+    return scores
+
+
+@njit("float64[::1](int64[:, ::1], int64, int64, int64[:, ::1], "
+      "int64[:, ::1], int64[:, ::1], int64)", parallel=True, cache=True)
+def _random_rollouts(prefix: np.ndarray, last: int, rollouts: int,
+                     allowed_moves: np.ndarray, move_deltas: np.ndarray,
+                     bond_scores: np.ndarray, chunks: int) -> np.ndarray:
+    """
+    Run the random walks of `random_rollouts` in a number of chunks, one
+    per thread. A cached function cannot ask Numba for the number of
+    threads, so the chunks are passed in.
+    """
+    length, start = bond_scores.shape[0], prefix.shape[0]
+    choices, directions = allowed_moves.shape[1], move_deltas.shape[0]
+    coordinates = np.zeros((rollouts, length, 3), dtype=np.int64)
+    stuck = np.zeros(rollouts, dtype=np.bool_)
+
+    # Every random walk runs on its own, Numba gives each thread its own
+    # random state. The walks are split in one chunk per thread, so each
+    # chunk reuses one occupancy bitmap and only clears the bits it set.
+    for chunk in prange(chunks):
+        occupied = _occupancy(length, directions)
+        free = np.empty(choices, dtype=np.int64)
+        for rollout in range(chunk, rollouts, chunks):
+            # The walk starts at the origin, which does not change its score
+            coordinates[rollout, :start] = prefix - prefix[0]
+            for index in range(start):
+                cell = _cell(coordinates[rollout, index, 0],
+                             coordinates[rollout, index, 1],
+                             coordinates[rollout, index, 2],
+                             length, directions)
+                occupied[cell >> 6] |= np.uint64(1) << np.uint64(cell & 63)
+
+            previous = last
+            placed = start
+            for index in range(start, length):
+                x, y, z = coordinates[rollout, index - 1]
+                count = 0
+                for choice in range(choices):
+                    move = allowed_moves[previous, choice]
+                    cell = _cell(x + move_deltas[move, 0],
+                                 y + move_deltas[move, 1],
+                                 z + move_deltas[move, 2], length, directions)
+                    if not occupied[cell >> 6] >> np.uint64(cell & 63) & 1:
+                        free[count] = move
+                        count += 1
+
+                if count == 0:
+                    stuck[rollout] = True
+                    break
+
+                move = free[np.random.randint(0, count)]
+                for axis in range(3):
+                    coordinates[rollout, index, axis] = (
+                        coordinates[rollout, index - 1, axis]
+                        + move_deltas[move, axis]
+                    )
+                cell = _cell(coordinates[rollout, index, 0],
+                             coordinates[rollout, index, 1],
+                             coordinates[rollout, index, 2],
+                             length, directions)
+                occupied[cell >> 6] |= np.uint64(1) << np.uint64(cell & 63)
+                placed = index + 1
+                previous = move
+
+            # Only this walk set bits, so clearing the words it touched
+            # empties the bitmap
+            for index in range(placed):
+                cell = _cell(coordinates[rollout, index, 0],
+                             coordinates[rollout, index, 1],
+                             coordinates[rollout, index, 2],
+                             length, directions)
+                occupied[cell >> 6] = 0
+
+    scores = score_rollouts(coordinates, bond_scores)
+    scores[stuck] = 0.0
+
+    return scores
+
+
+def random_rollouts(prefix: np.ndarray, last: int, rollouts: int,
+                    allowed_moves: np.ndarray, move_deltas: np.ndarray,
+                    bond_scores: np.ndarray) -> np.ndarray:
+    """
+    Complete a partial folding with self-avoiding random walks and score
+    each of them.
+
+    Every step picks uniformly from the allowed directions that do not run
+    into the walk itself. A walk that gets stuck is not a valid folding and
+    scores 0, no better than a folding without any contacts.
+
+    Parameters
+    ----------
+    prefix : np.ndarray
+        The positions of the partial folding, shaped (length, 3).
+    last : int
+        The index of the last direction of the partial folding.
+    rollouts : int
+        The number of random walks.
+    allowed_moves : np.ndarray
+        The directions allowed after every direction, which leave out its
+        reverse, shaped (directions, directions - 1).
+    move_deltas : np.ndarray
+        The step of every direction.
+    bond_scores : np.ndarray
+        The score of every pair of amino acids, see `score_rollouts`.
+
+    Returns
+    -------
+    np.ndarray
+        The score of every random walk.
+    """
+    return _random_rollouts(prefix, last, rollouts, allowed_moves,
+                            move_deltas, bond_scores,
+                            min(get_num_threads(), rollouts))
+
+
+@njit("int64[:, :, ::1](int64, int64, int64[:, ::1], int64, int64)",
+      parallel=True, cache=True)
+def _random_foldings(length: int, foldings: int, move_deltas: np.ndarray,
+                     max_backtracking: int, chunks: int) -> np.ndarray:
+    """
+    Make the foldings of `random_foldings` in a number of chunks, one per
+    thread. A cached function cannot ask Numba for the number of threads,
+    so the chunks are passed in.
+    """
+    directions = move_deltas.shape[0]
+    all_directions = (1 << directions) - 1
+    coordinates = np.zeros((foldings, length, 3), dtype=np.int64)
+
+    # Every folding runs on its own, Numba gives each thread its own random
+    # state. The foldings are split in one chunk per thread, so each chunk
+    # reuses one occupancy bitmap and only clears the bits it set.
+    for chunk in prange(chunks):
+        occupied = _occupancy(length, directions)
+        untried = np.empty(length, dtype=np.int64)
+        free = np.empty(directions, dtype=np.int64)
+        for folding in range(chunk, foldings, chunks):
+            if length > 0:
+                cell = _cell(0, 0, 0, length, directions)
+                occupied[cell >> 6] |= np.uint64(1) << np.uint64(cell & 63)
+            index = 1
+            if length > 1:
+                untried[1] = all_directions
+            backtracked = 0
+
+            while index < length:
+                # The untried directions that do not run into the walk itself
+                x, y, z = coordinates[folding, index - 1]
+                count = 0
+                for move in range(directions):
+                    if not untried[index] >> move & 1:
+                        continue
+                    cell = _cell(x + move_deltas[move, 0],
+                                 y + move_deltas[move, 1],
+                                 z + move_deltas[move, 2], length, directions)
+                    if not occupied[cell >> 6] >> np.uint64(cell & 63) & 1:
+                        free[count] = move
+                        count += 1
+
+                if count == 0:
+                    # Step back, or start over after too many steps back,
+                    # and free the positions that are given up
+                    backtracked += 1
+                    if index == 1 or backtracked > max_backtracking:
+                        given_up = index - 1
+                        index = 1
+                        untried[1] = all_directions
+                        backtracked = 0
+                    else:
+                        given_up = 1
+                        index -= 1
+                    for other in range(index, index + given_up):
+                        cell = _cell(coordinates[folding, other, 0],
+                                     coordinates[folding, other, 1],
+                                     coordinates[folding, other, 2],
+                                     length, directions)
+                        occupied[cell >> 6] &= ~(np.uint64(1)
+                                                 << np.uint64(cell & 63))
+                    continue
+
+                move = free[np.random.randint(0, count)]
+                for axis in range(3):
+                    coordinates[folding, index, axis] = (
+                        coordinates[folding, index - 1, axis]
+                        + move_deltas[move, axis]
+                    )
+                cell = _cell(coordinates[folding, index, 0],
+                             coordinates[folding, index, 1],
+                             coordinates[folding, index, 2],
+                             length, directions)
+                occupied[cell >> 6] |= np.uint64(1) << np.uint64(cell & 63)
+                untried[index] &= ~(1 << move)
+                index += 1
+                if index < length:
+                    untried[index] = all_directions & ~(1 << (move ^ 1))
+
+            # Only this folding set bits, so clearing the words it touched
+            # empties the bitmap
+            for index in range(length):
+                cell = _cell(coordinates[folding, index, 0],
+                             coordinates[folding, index, 1],
+                             coordinates[folding, index, 2],
+                             length, directions)
+                occupied[cell >> 6] = 0
+
+    return coordinates
+
+
+def random_foldings(length: int, foldings: int, move_deltas: np.ndarray,
+                    max_backtracking: int) -> np.ndarray:
+    """
+    Fold a protein at random a number of times without overlap.
+
+    Every folding is a random walk that backtracks when it gets stuck. Each
+    amino acid keeps the directions it has not tried yet, so after stepping
+    back the walk tries another direction. After too many steps back the
+    walk starts over, like `RandomFold.backtracking`.
+
+    Parameters
+    ----------
+    length : int
+        The number of amino acids.
+    foldings : int
+        The number of foldings.
+    move_deltas : np.ndarray
+        The step of every direction, the reverse of a direction is its
+        index XOR 1, shaped (directions, 3).
+    max_backtracking : int
+        The number of steps back after which a folding starts over.
+
+    Returns
+    -------
+    np.ndarray
+        The positions of the amino acids, shaped (foldings, length, 3).
+    """
+    return _random_foldings(length, foldings, move_deltas, max_backtracking,
+                            min(get_num_threads(), foldings))
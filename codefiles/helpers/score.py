@@ -0,0 +1,40 @@
+import numpy as np
+from numba import njit
+
+# Kept apart from the parallel kernels in kernels.py: loading those starts
+# Numba's threading layer, after which a process that forks workers hangs
+# on exit. Protein imports this module, and forks are made after that.
+
+
+@njit("int64(int64[:, ::1], int64[:, ::1])", cache=True)
+def score_folding(positions: np.ndarray, bond_scores: np.ndarray) -> int:
+    """
+    Score a single folding by its contacts between amino acids.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        The positions of the amino acids, shaped (length, 3).
+    bond_scores : np.ndarray
+        The score of every pair of amino acids, see `kernels.score_rollouts`.
+
+    Returns
+    -------
+    int
+        The score of the folding.
+    """
+    length = positions.shape[0]
+    score = 0
+
+    for i in range(length - 3):
+        # Amino acids an even number of steps apart are never adjacent
+        for j in range(i + 3, length, 2):
+            if bond_scores[i, j] == 0:
+                continue
+            distance = (abs(positions[i, 0] - positions[j, 0])
+                        + abs(positions[i, 1] - positions[j, 1])
+                        + abs(positions[i, 2] - positions[j, 2]))
+            if distance == 1:
+                score += bond_scores[i, j]
+
+    return score
@@ -0,0 +1,73 @@
+from typing import Tuple
+import numpy as np
+from numba import njit
+
+# Serial like score.py, so the algorithms can import it before they fork
+# workers.
+
+
+@njit("Tuple((int64[:, ::1], boolean[::1]))(int64, int64[:, ::1])",
+      cache=True)
+def last_walks(length: int,
+               move_deltas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the last walk in lexicographic order that ends at every offset from
+    its start.
+
+    All walks of the length that never step straight back are enumerated,
+    they may still run into themselves.
+
+    Parameters
+    ----------
+    length : int
+        The number of steps of the walks.
+    move_deltas : np.ndarray
+        The step of every direction, shaped (directions, 3). The reverse of
+        a direction is its index XOR 1.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The directions of the walk for every offset, shaped
+        ((2 * length + 1) ** 3, length), and whether any walk ends at the
+        offset. The offset (x, y, z) is found at
+        ((x + length) * size + y + length) * size + z + length, where size
+        is 2 * length + 1.
+    """
+    directions = move_deltas.shape[0]
+    size = 2 * length + 1
+    walks = np.zeros((size ** 3, length), dtype=np.int64)
+    found = np.zeros(size ** 3, dtype=np.bool_)
+
+    walk = np.zeros(length, dtype=np.int64)
+    positions = np.zeros((length + 1, 3), dtype=np.int64)
+    next_moves = np.zeros(length + 1, dtype=np.int64)
+
+    # Depth first in the order of the directions, so a later walk to the
+    # same offset is always the later one in lexicographic order
+    depth = 0
+    while depth >= 0:
+        if depth == length:
+            cell = (((positions[depth, 0] + length) * size
+                     + positions[depth, 1] + length) * size
+                    + positions[depth, 2] + length)
+            walks[cell] = walk
+            found[cell] = True
+            depth -= 1
+            continue
+
+        move = next_moves[depth]
+        if move == directions:
+            next_moves[depth] = 0
+            depth -= 1
+            continue
+
+        next_moves[depth] = move + 1
+        if depth > 0 and move == walk[depth - 1] ^ 1:
+            continue
+
+        walk[depth] = move
+        positions[depth + 1] = positions[depth] + move_deltas[move]
+        depth += 1
+
+    return walks, found
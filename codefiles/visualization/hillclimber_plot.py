@@ -22,17 +22,18 @@ def main() -> None:
     output_path = 'data/output/hillclimber_data/plots/'
     os.makedirs(output_path, exist_ok=True)
 
-    index = 0
-    for plots, csv_filename in zip(lst_, csv_files):
-        figure_title = csv_files[index]
+    for plots, figure_title in zip(lst_, csv_files):
+
+        # Make sure the folder of the figures exists before saving to it
+        figure_folder = os.path.join(output_path, figure_title)
+        os.makedirs(figure_folder, exist_ok=True)
+
         for plot in plots:
             title = plot.get_axes()[0].get_title()
             figure_name = f"{figure_title}_{title}_plot.png"
-            figure_path = os.path.join(
-                output_path+figure_title+"/", figure_name)
+            figure_path = os.path.join(figure_folder, figure_name)
             plot.savefig(figure_path)
             print(f"Saved plot: {figure_path}")
-        index += 1
 
 
 if __name__ == "__main__":
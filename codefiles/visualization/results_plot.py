@@ -1,104 +1,132 @@
 import argparse
 import os
-import matplotlib.pyplot as plt
-import csv
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 import numpy as np
+import pandas as pd
 
 
 def read_csv_file(file_path):
-    with open(file_path, 'r') as file:
-        csvreader = csv.reader(file)
-        rows = [row for row in csvreader if row]  # Skip empty lines
-
-        number_of_iterations = 1000
-        y, avg, names = [], [], []
-        seq_values = []
-
-        for row in rows:
-            if row[0].startswith('Average:'):
-                try:
-                    avg_value = float(row[1])
-                    avg.append(avg_value)
-                    y.append(seq_values)
-                    seq_values = []  # Reset for the next sequence
-                except ValueError:
-                    print(
-                        f"Warning: Could not parse average value '{row[1]}' as float.")
-                    avg.append(None)
-            else:
-                try:
-                    seq_values.append(float(row[-1]))
-                    if len(seq_values) == 1:  # First entry of a new sequence
-                        # Assuming the protein chain name is in the second column
-                        names.append(row[1])
-                except ValueError:
-                    print(
-                        f"Warning: Could not parse value '{row[-1]}' as float.")
-
-        return y, avg, names
+    # Parse the whole file at once, every cell is kept as a string so the
+    # "Average:" rows can be told apart from the scores
+    table = pd.read_csv(file_path, header=None, dtype=str,
+                        keep_default_na=False)
+    first, second, last = table[0], table[1], table[table.columns[-1]]
+
+    is_average = first.str.startswith('Average:').to_numpy()
+    values = pd.to_numeric(
+        second.where(is_average, last), errors='coerce').to_numpy()
+    is_score = ~is_average & ~np.isnan(values)
+
+    for row in np.flatnonzero(~is_average & ~is_score):
+        print(f"Warning: Could not parse value '{last[row]}' as float.")
+
+    y, avg, names = [], [], []
+    start = 0
+
+    # Every "Average:" row closes the sequence of scores before it
+    for row in [*np.flatnonzero(is_average), len(table)]:
+        if row < len(table) and np.isnan(values[row]):
+            print(
+                f"Warning: Could not parse average value '{second[row]}' as float.")
+            avg.append(None)
+            continue
+
+        scores = np.flatnonzero(is_score[start:row]) + start
+        if len(scores):
+            # Assuming the protein chain name is in the second column
+            names.append(second[scores[0]])
+
+        if row < len(table):
+            avg.append(float(values[row]))
+            y.append(values[scores])
+            start = row + 1
+
+    return y, avg, names
+
+
+def _plot_histogram(iteration_scores, iteration_averages, protein_name,
+                    algorithm_names, output_folder, file_name, dimension):
+    # Define a color palette for the algorithms
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#9467bd']
+    lighter_colors = ['#add8e6', '#ffd699', '#90ee90',
+                      '#c5b0d5']  # Lighter shades for 4 algorithms
+
+    # A figure outside of pyplot, so no state is shared between the plots
+    fig = Figure()
+    ax = fig.subplots()
+
+    # Determine the range of stability scores for this iteration, over the
+    # scores of all algorithms at once
+    all_scores = np.concatenate(iteration_scores)
+    min_score, max_score = all_scores.min(), all_scores.max()
+    max_score = max(0, max_score)  # Ensure the range goes up to at least 0
+    score_range = np.arange(min_score, max_score + 1, 1)
+
+    # The scores are whole numbers, so every bin is centred on a score
+    bin_edges = np.append(score_range, max_score + 1) - 0.5
+
+    # Width of bars and the number of algorithms
+    width = 0.2
+    num_algorithms = len(iteration_scores)
+
+    # Group bars for each stability score
+    for j, (scores, avg) in enumerate(zip(iteration_scores, iteration_averages)):
+        # Count the frequency of each score
+        score_counts, _ = np.histogram(scores, bins=bin_edges)
+        ax.bar(score_range - (width * num_algorithms / 2) + j * width,
+               score_counts, width, color=colors[j], label=f"{algorithm_names[j]}")
+
+        # Add a line for the average with a darker color
+        ax.axvline(x=avg, color=colors[j],
+                   linestyle='dashed', linewidth=1.5)
+
+        # Add a line for the minimum with a lighter color
+        min_val = scores.min()
+        ax.axvline(
+            x=min_val, color=lighter_colors[j], linestyle='dotted', linewidth=1.5)
+
+    # Create custom handles for the legend
+    handles, labels = ax.get_legend_handles_labels()
+    avg_line = Line2D([0], [0], color='black',
+                      linestyle='dashed', linewidth=1.5, label='Avg')
+    min_line = Line2D([0], [0], color='gray',
+                      linestyle='dotted', linewidth=1.5, label='Min')
+
+    # Insert Avg and Min lines at the beginning of the handles list
+    handles = [avg_line, min_line] + handles
+
+    # Set plot title to include the protein sequence name
+    ax.set_title(f"{protein_name} - {dimension}")
+    ax.set_xlabel('Stability Score')
+    ax.set_ylabel('Frequency')
+    ax.legend(handles=handles, fontsize='small',
+              loc='upper left', bbox_to_anchor=(0, 1))
+    ax.grid(True)
+
+    fig_name = f"{protein_name}_{file_name}.png"
+    fig.savefig(os.path.join(output_folder, fig_name))
+    print(f"Saved plot: {os.path.join(output_folder, fig_name)}")
 
 
 def plot_combined_histogram(data, averages, names, algorithm_names, output_folder, file_name, dimension):
     os.makedirs(output_folder, exist_ok=True)
 
-    # Define a color palette for the algorithms
-    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#9467bd']
-    lighter_colors = ['#add8e6', '#ffd699', '#90ee90',
-                      '#c5b0d5']  # Lighter shades for 4 algorithms
+    # The scores and averages of all algorithms for each protein
+    iteration_scores = list(zip(*data))
+    iteration_averages = list(zip(*averages))
+    protein_names = [names[i] if i < len(names) else "Unknown Protein"
+                     for i in range(len(iteration_scores))]
 
-    for i in range(len(data[0])):
-        fig, ax = plt.subplots()
-
-        # Determine the range of stability scores for this iteration
-        iteration_scores = [seq_data[i] for seq_data in data]
-
-        min_score, max_score = min(map(min, iteration_scores)), max(
-            map(max, iteration_scores))
-        max_score = max(0, max_score)  # Ensure the range goes up to at least 0
-        score_range = np.arange(min_score, max_score + 1, 1)
-
-        # Width of bars and the number of algorithms
-        width = 0.2
-        num_algorithms = len(data)
-
-        # Group bars for each stability score
-        for j, (seq_data, avg) in enumerate(zip(data, averages)):
-            # Count the frequency of each score
-            score_counts = [seq_data[i].count(score) for score in score_range]
-            ax.bar(score_range - (width * num_algorithms / 2) + j * width,
-                   score_counts, width, color=colors[j], label=f"{algorithm_names[j]}")
-
-            # Add a line for the average with a darker color
-            ax.axvline(x=avg[i], color=colors[j],
-                       linestyle='dashed', linewidth=1.5)
-
-            # Add a line for the minimum with a lighter color
-            min_val = min(seq_data[i])
-            ax.axvline(
-                x=min_val, color=lighter_colors[j], linestyle='dotted', linewidth=1.5)
-
-       # Create custom handles for the legend
-        handles, labels = ax.get_legend_handles_labels()
-        avg_line = plt.Line2D([0], [0], color='black',
-                              linestyle='dashed', linewidth=1.5, label='Avg')
-        min_line = plt.Line2D([0], [0], color='gray',
-                              linestyle='dotted', linewidth=1.5, label='Min')
-
-        # Insert Avg and Min lines at the beginning of the handles list
-        handles = [avg_line, min_line] + handles
-
-        # Set plot title to include the protein sequence name
-        protein_name = names[i] if i < len(names) else "Unknown Protein"
-        ax.set_title(f"{protein_name} - {dimension}")
-        ax.set_xlabel('Stability Score')
-        ax.set_ylabel('Frequency')
-        ax.legend(handles=handles, fontsize='small',
-                  loc='upper left', bbox_to_anchor=(0, 1))
-        plt.grid(True)
-
-        fig_name = f"{protein_name}_{file_name}.png"
-        fig.savefig(os.path.join(output_folder, fig_name))
-        print(f"Saved plot: {os.path.join(output_folder, fig_name)}")
+    # Every protein gets its own figure, so they are drawn in parallel
+    plot = partial(_plot_histogram, algorithm_names=algorithm_names,
+                   output_folder=output_folder, file_name=file_name,
+                   dimension=dimension)
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(plot, iteration_scores,
+             iteration_averages, protein_names))
 
 
 def main():
@@ -123,18 +151,20 @@ def main():
                     "data/output/hillclimber_data/", "data/output/annealing_data/"]  # Add your folder paths
     algorithm_names = ["Fress", "BFS", "Hill Climber", "Simulated Annealing"]
 
-    data = []
-    averages = []
-    for folder in folder_paths:
-        file_path = os.path.join(folder, file_name)
-        if os.path.exists(file_path):
-            y, avg, names = read_csv_file(file_path)
-            data.append(y)
-            averages.append(avg)
-        else:
+    file_paths = [os.path.join(folder, file_name) for folder in folder_paths]
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
             print(f"File not found: {file_path}")
             return
 
+    # Read the files of all algorithms at the same time
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(read_csv_file, file_paths))
+
+    data = [y for y, _, _ in results]
+    averages = [avg for _, avg, _ in results]
+    names = results[-1][2]
+
     if letter:
         output_path = f'data/output/plot_results/{dimension}D_{letter}'
     else:
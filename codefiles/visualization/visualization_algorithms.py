@@ -1,7 +1,7 @@
-import matplotlib.pyplot as plt
-import csv
+from matplotlib.figure import Figure
 import math
 import numpy as np
+import pandas as pd
 
 
 def reading_the_csv_file(file):
@@ -17,24 +17,23 @@ def reading_the_csv_file(file):
     - avg (list): List of average values from each sequence.
     - amount_seq (int): Number of sequences in the file.
     """
-    csvreader = csv.reader(file)
-
-    rows = []
-    for row in csvreader:
-        rows.append(row)
+    # Parse the whole file at once, blank lines are kept as rows of NaN so
+    # every sequence still spans the same number of rows
+    table = pd.read_csv(file, header=None, dtype=str,
+                        skip_blank_lines=False)
 
     number_of_gens = 10**5
-    x = number_of_gens
-    c, y, avg, amount_seq = [], [], [], math.floor(
-        len(rows) / (number_of_gens - 1))
-
-    for _ in range(amount_seq):
-        for i in rows[x - number_of_gens:x]:
-            y.append(int(i[-1]))
-            if i[-2] not in c:
-                c.append(i[-2])
-        avg.append(rows[x + 1])
-        x += number_of_gens + 4
+    amount_seq = math.floor(len(table) / (number_of_gens - 1))
+
+    # Every sequence takes its generations followed by a blank line, the
+    # average and two more blank lines
+    starts = np.arange(amount_seq) * (number_of_gens + 4)
+    generations = (starts[:, None] + np.arange(number_of_gens)).ravel()
+
+    y = table.iloc[generations, -1].astype(np.int64).tolist()
+    c = pd.unique(table.iloc[generations, -2]).tolist()
+    avg = [table.iloc[start + number_of_gens + 1].dropna().tolist()
+           for start in starts]
 
     return c, y, avg, amount_seq
 
@@ -55,8 +54,10 @@ def plot_random(file, dimension):
     number_of_gens = 10**5
 
     for count, val in enumerate(range(number_of_gens, (amount_seq + 1) * number_of_gens, number_of_gens)):
-        # Create a new Figure and Axes for each plot
-        fig, ax = plt.subplots()
+        # Create a new Figure and Axes for each plot, outside of pyplot so
+        # the figures are freed once the caller is done with them
+        fig = Figure()
+        ax = fig.subplots()
 
         # Start bins at the lesser of the minimum value or 0
         bin_start = min(min(y[val - number_of_gens:val]), 0)
@@ -99,8 +100,10 @@ def plot_line(file):
     number_of_gens = 10**5
 
     for count, val in enumerate(range(number_of_gens, (amount_seq + 1) * number_of_gens, number_of_gens)):
-        # Create a new Figure and Axes for each plot
-        fig, ax = plt.subplots()
+        # Create a new Figure and Axes for each plot, outside of pyplot so
+        # the figures are freed once the caller is done with them
+        fig = Figure()
+        ax = fig.subplots()
 
         # Generate x values as iteration numbers
         x_values = list(range(val - number_of_gens, val))
@@ -0,0 +1,106 @@
+"""
+plot_protein Function
+Date of Creation: February 1, 2024
+Description: This function generates a 2D or 3D scatter plot of amino acid positions in a given protein structure.
+             Amino acids of different types (Hydrophobic, Polar, Cysteine) are distinguished by colors.
+             The resulting plot is saved as an image file. It does the drawing for plot_2d and plot_3d.
+Developer: Ilyass el Allali
+"""
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from typing import Tuple
+from ..classes.protein import Protein
+from ..helpers.bonds import bond_midpoints
+
+
+def plot_protein(protein: Protein, colors: Tuple[str, str, str], filename: str,
+                 dimensions: int, output: str = "png") -> None:
+    """
+    Plot a 2D or 3D representation of the protein structure.
+
+    Parameters
+    ----------
+    protein : Protein
+        The protein structure to be visualized.
+    colors : Tuple[str, str, str]
+        A tuple of three colors representing different amino acid types (Hydrophobic, Polar, Cysteine).
+    filename : str
+        The name of the output image file.
+    dimensions : int
+        2 for a flat plot, 3 for a plot in perspective.
+    output : str
+        The format of the image file, "png" or "svg".
+    """
+    # Convert colors to lowercase for consistency
+    colors = [color.lower() for color in colors]
+
+    # The color of every amino acid, looked up by its type
+    type_colors = dict(zip("HPC", colors))
+    colors_ = [type_colors[amino_type] for amino_type in protein._sequence]
+    types = "HPC" if "C" in protein._sequence else "HP"
+
+    positions = protein.get_positions()
+    coordinates = positions[:, :dimensions].T.tolist()
+    x_min, y_min, z_min = positions.min(axis=0).tolist()
+    x_max, y_max, z_max = positions.max(axis=0).tolist()
+
+    # Create a new figure for the plot
+    fig = Figure()
+    ax = fig.add_subplot(projection="3d" if dimensions == 3 else None)
+
+    # Scatter plot for amino acid positions
+    ax.scatter(*coordinates, s=50, c=colors_, marker="o")
+
+    # Mark the bonds between amino acids that are next to each other
+    # but not connected, just below their midpoints
+    bonds_H, bonds_C = bond_midpoints(positions, protein._sequence)
+    offset = np.array((0, -0.05, -0.05))[:dimensions]
+
+    ax.scatter(*(bonds_H[:, :dimensions] + offset).T, s=40, c='black',
+               marker=r"$*$")
+    if "C" in types:
+        ax.scatter(*(bonds_C[:, :dimensions] + offset).T, s=45, c='black',
+                   marker=r"$\#$")
+
+    # Line plot connecting amino acid positions
+    ax.plot(*coordinates, linestyle="-", color="black", alpha=0.7)
+
+    # Set plot limits and turn off axis
+    ax.set_xlim((x_min - 2, x_max + 2))
+    ax.set_ylim((y_min - 2, y_max + 2))
+    if dimensions == 3:
+        ax.set_zlim((z_min - 2, z_max + 2))
+    ax.axis("off")
+
+    # Create a legend outside ax.legend
+    legend_handles = [
+        Line2D(
+            [0],
+            [0],
+            marker="o",
+            color=color,
+            markerfacecolor=color,
+            markersize=10,
+        )
+        for color in colors[:len(types)]
+    ]
+    ax.legend(legend_handles, list(types), loc="upper right")
+
+    # Add a text annotation for the score and mark the origin
+    score_text = f"Score: {protein.get_score()}"
+    origin_font = {'fontweight': 'bold', 'style': 'italic'}
+    if dimensions == 2:
+        ax.text(x_min / 2.5, y_max + 1, score_text,
+                fontsize=12.5, color='red')
+        ax.text(0.4, 0.3, "(0, 0)", fontsize=6, color='black', ha='right',
+                va='top', fontdict=origin_font)
+    else:
+        ax.text(x_min - 2, y_max + 2, z_max + 2, score_text,
+                fontsize=12.5, color='red')
+        ax.text(0.3, 0.3, 0.4, "(0, 0, 0)", fontsize=4, color='black',
+                ha='right', va='top', fontdict=origin_font)
+
+    fig.savefig(filename, format='png' if output == "png" else 'svg')
+    print(f"{filename} created")
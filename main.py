@@ -8,33 +8,118 @@ Docstrings: Generated by GitHub Copilot.
 """
 
 import os
+import random
 import sys
-import subprocess
 import csv
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib import import_module
+from typing import Tuple
 
 from codefiles.classes.protein import Protein
-from codefiles.visualization import visualization_2D
-from codefiles.visualization import visualization_3D
 
 # Dynamically get filenames without extensions from the algorithms directory
-ALGORITHM_FILES = [
+ALGORITHM_FILES = frozenset(
     os.path.splitext(file)[0]
     for file in os.listdir("codefiles/algorithms")
     if file.endswith(".py") and file != "__init__.py"
-]
+)
+
+# The function of every generate_<algorithm>.py module that generates data
+GENERATE_FUNCTIONS = {
+    "annealing": "generate_data",
+    "bfs_random": "generate_bfs",
+    "fress": "generate_fress",
+    "hillclimber": "generate_data",
+}
+
+
+@lru_cache(maxsize=None)
+def _load_fold(fold_algorithm: str) -> type:
+    """
+    Imports the module of a fold algorithm and returns its class.
+
+    Parameters:
+    - fold_algorithm (str): The name of the algorithm file, without extension.
+
+    Returns:
+    - type: The <Algorithm>Fold class of the module.
+    """
+    fold_algorithm_module = import_module(
+        f"codefiles.algorithms.{fold_algorithm}")
+
+    return getattr(fold_algorithm_module, fold_algorithm.capitalize() + "Fold")
+
+
+def _fold_sequence(args: Tuple[str, int, int, int, str, int, str,
+                                bool]) -> None:
+    """
+    Folds one protein sequence in a worker process and writes its CSV file
+    and, if requested, its visualization.
+
+    Parameters:
+    - args (Tuple[str, int, int, int, str, int, str, bool]): The fold
+      algorithm, the dimensions, the iterations, the line number of the
+      sequence, the sequence, the random seed of the run, the suffix of the
+      output filenames and whether to plot the fold.
+
+    Returns:
+    - None
+    """
+    fold_algorithm, dimensions, iterations, line_number, sequence, seed, \
+        suffix, plot = args
+    random.seed(seed)
+
+    # Create a Protein object for the sequence
+    test_protein: Protein = Protein(sequence)
+
+    # Initialize the folding algorithm class, imported in the worker since
+    # some algorithms load the parallel Numba kernels, which must not be
+    # loaded before forking
+    fold_instance = _load_fold(fold_algorithm)(
+        test_protein, dimensions, iterations)
+
+    # Call the run method of the folding algorithm
+    test_protein = fold_instance.run()
+
+    # Set the output filenames
+    filename = f"data/output/csv/{fold_algorithm}_{line_number}_{suffix}.csv"  # noqa
+    plotname = f"data/output/plot/{fold_algorithm}_{line_number}_{suffix}.png"  # noqa
+
+    # Write the results to a CSV file
+    test_protein.create_csv(filename)
+
+    # Skip the visualization if it was not requested, importing matplotlib
+    # and rendering take longer than folding a short sequence
+    if not plot:
+        return
+
+    # Import matplotlib only in the workers, and only the plot for the
+    # chosen dimensions
+    if dimensions == 2:
+        from codefiles.visualization.visualization_2D import \
+            plot_2d as plot_protein
+    else:
+        from codefiles.visualization.visualization_3D import \
+            plot_3d as plot_protein
+
+    # Write the visualization to a file
+    plot_protein(test_protein, ("red", "blue", "green"), plotname, 'png')
 
 
 def main() -> None:
     """
     Main function that reads protein sequences from a file and generates protein folds using the specified algorithm.
 
-    Usage: python main.py <fold_algorithm> <dimensions> <iterations> <y/n> ['generate']
+    Usage: python main.py <fold_algorithm> <dimensions> <iterations> <y/n> ['generate' | 'noplot']
 
     Parameters:
     - fold_algorithm (str): The algorithm to use for protein folding.
     - dimensions (int): The number of dimensions for the protein fold (2 or 3).
     - iterations (int): The number of iterations for the protein folding process.
     - C/c (optional): Specify 'C' or 'c' to use a different input file.
+    - generate (optional): Generate data for the algorithm instead.
+    - noplot (optional): Skip the visualization of the folds.
 
     Raises:
     - ValueError: If the specified fold algorithm is invalid.
@@ -43,12 +128,13 @@ def main() -> None:
     # Check if the correct number of command line arguments is given
     if len(sys.argv) != 5 and len(sys.argv) != 6:
         print(
-            "Usage: python main.py <fold_algorithm> <dimensions> <iterations> <y/n> ['generate']")  # noqa
+            "Usage: python main.py <fold_algorithm> <dimensions> <iterations> <y/n> ['generate' | 'noplot']")  # noqa
         sys.exit(1)
 
-    if len(sys.argv) == 6 and sys.argv[5].lower() != "generate":
+    if len(sys.argv) == 6 and \
+            sys.argv[5].lower() not in ("generate", "noplot"):
         print(
-            "Usage: python main.py <fold_algorithm> <dimensions> <iterations> <y/n> ['generate']")  # noqa
+            "Usage: python main.py <fold_algorithm> <dimensions> <iterations> <y/n> ['generate' | 'noplot']")  # noqa
         sys.exit(1)
 
     fold_algorithm: str = sys.argv[1].lower()
@@ -74,89 +160,53 @@ def main() -> None:
         raise ValueError("Specify 'y' or 'n' for including the C acid.")
 
     if len(sys.argv) == 6 and sys.argv[5].lower() == "generate":
-        # Get a copy of the current environment variables
-        env = os.environ.copy()
-
-        # Add the parent directory of codefiles to the Python path in the new
-        # environment
-        env["PYTHONPATH"] = os.path.abspath(os.path.join(
-            os.path.dirname(__file__), '..')) + ":" + env.get("PYTHONPATH", "")
-
-        # Call the generate_<algorithm>.py script with the correct parameters
-        subprocess.run(["python3",
-                        f"codefiles/fold_generation/generate_{fold_algorithm}.py",  # noqa
-                        str(dimensions),
-                        "t" if sys.argv[4].lower() == "y" else "f"],
-                       env=env)
-
-    elif len(sys.argv) == 5:
-
-        # Determine the file to read the protein sequence from
+        # Check if the specified fold algorithm can generate data
+        if fold_algorithm not in GENERATE_FUNCTIONS:
+            raise ValueError("No data generation for this fold type.")
+
+        # Call the generate function of generate_<algorithm>.py in this
+        # process with the correct parameters
+        generate_module = import_module(
+            f"codefiles.fold_generation.generate_{fold_algorithm}")
+        generate = getattr(generate_module, GENERATE_FUNCTIONS[fold_algorithm])
+        generate(dimensions, sys.argv[4].lower() == "y")
+
+    else:
+        # Plot the folds unless 'noplot' is given
+        plot = len(sys.argv) == 5
+
+        # Determine the file to read the protein sequence from and the
+        # suffix of the output filenames, the same for every sequence
         if sys.argv[4].lower() == "n":
             sequence_file = "data/input/sequences_H_P.csv"
+            suffix = f"{dimensions}D"
         else:
             sequence_file = "data/input/sequences_H_P_C.csv"
-
-        # Dynamically import the specified fold algorithm
-        fold_algorithm_module = __import__(
-            f"codefiles.algorithms.{fold_algorithm}",
-            fromlist=[fold_algorithm])
-
-        # Construct the class name
-        class_name = fold_algorithm.capitalize() + "Fold"
-
-        # Get the specified fold algorithm class
-        fold_algorithm_class = getattr(
-            fold_algorithm_module, class_name)
+            suffix = f"{dimensions}D_C"
 
         # Read the protein sequence from the file
         with open(sequence_file, "r") as file:
             reader = csv.reader(file)
-            line_number: int = 0
+            jobs = []
 
-            # Read the file line by line until an empty line is reached
-            for row in reader:
+            # Read the file line by line until an empty line is reached,
+            # each sequence gets its own seed
+            for line_number, row in enumerate(reader):
                 if not row:
                     break
-
-                # Create Protein objects for each sequence
-                sequence: str = row[0]
-                test_protein: Protein = Protein(sequence)
-
-                # Initialize the folding algorithm class
-                fold_instance = fold_algorithm_class(
-                    test_protein, dimensions, iterations)
-
-                # Call the run method of the folding algorithm
-                test_protein = fold_instance.run()
-
-                # Set the output filenames
-                if dimensions == 2:
-                    if sys.argv[4].lower() == "n":
-                        filename = f"data/output/csv/{fold_algorithm}_{line_number}_2D.csv"  # noqa
-                        plotname = f"data/output/plot/{fold_algorithm}_{line_number}_2D.png"  # noqa
-                    elif sys.argv[4].lower() == "y":
-                        filename = f"data/output/csv/{fold_algorithm}_{line_number}_2D_C.csv"  # noqa
-                        plotname = f"data/output/plot/{fold_algorithm}_{line_number}_2D_C.png"  # noqa
-                else:
-                    if sys.argv[4].lower() == "n":
-                        filename = f"data/output/csv/{fold_algorithm}_{line_number}_3D.csv"  # noqa
-                        plotname = f"data/output/plot/{fold_algorithm}_{line_number}_3D.png"  # noqa
-                    elif sys.argv[4].lower() == "y":
-                        filename = f"data/output/csv/{fold_algorithm}_{line_number}_3D_C.csv"  # noqa
-                        plotname = f"data/output/plot/{fold_algorithm}_{line_number}_3D_C.png"  # noqa
-
-                # Write the results to a CSV file and the visualization to a file
-                test_protein.create_csv(filename)
-                if dimensions == 2:
-                    visualization_2D.plot_2d(
-                        test_protein, ("red", "blue", "green"),
-                        plotname, 'png')
-                else:
-                    visualization_3D.plot_3d(
-                        test_protein, ("red", "blue", "green"),
-                        plotname, 'png')
-                line_number += 1
+                jobs.append((fold_algorithm, dimensions, iterations,
+                             line_number, row[0], random.randrange(2 ** 32),
+                             suffix, plot))
+
+        # Make sure the folder of the plots exists, create_csv makes the
+        # folder of the CSV files
+        if plot:
+            os.makedirs("data/output/plot", exist_ok=True)
+
+        # Fold the sequences in parallel, one process per CPU
+        with ProcessPoolExecutor() as executor:
+            for _ in executor.map(_fold_sequence, jobs):
+                pass
 
 
 if __name__ == "__main__":
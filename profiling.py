@@ -45,13 +45,18 @@ def main() -> None:
 
     class_name = algorithm.capitalize() + "Fold"
     AlgorithmFold = getattr(module, class_name)
-    protein = Protein("HCPHPHPHCHHHHPCCPPHPPPHPPPPCPPPHPPPHPHHHHCHPHPHPHH")
+    sequence = "HCPHPHPHCHHHHPCCPPHPPPHPPPPCPPPHPPPHPHHHHCHPHPHPHH"
+    protein = Protein(sequence)
 
     def run_algorithm():
         # Create an instance of the class
         instance = AlgorithmFold(protein, 3, iterations)
         instance.run()
 
+    # The Numba kernels are compiled on import, but their first call still
+    # sets up threads, so fold a short protein once outside the profile
+    AlgorithmFold(Protein(sequence[:10]), 3, 1).run()
+
     output = f"data/output/profiles/{algorithm}.prof"
     cProfile.runctx('run_algorithm()', globals(), locals(), output)
 